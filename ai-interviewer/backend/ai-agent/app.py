@@ -3,24 +3,35 @@ AI Agent FastAPI Service
 Provides REST API endpoints for resume parsing and interview question generation
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks
+from fastapi.responses import StreamingResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, ConfigDict
+from typing import List, Optional, Dict, Any, Tuple
 import os
+import re
 import json
+import orjson
+import tiktoken
 import logging
 import time
 import random
+import asyncio
+import hashlib
+import httpx
+import numpy as np
+from functools import lru_cache
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
 
 import sqlite3
 from memori import Memori
 
 # Configure structured logging
+# LOG_LEVEL=DEBUG turns on per-request debug lines; they cost nothing at the default INFO
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
     format='%(asctime)s | %(levelname)s | %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S'
 )
@@ -30,13 +41,14 @@ logger = logging.getLogger("ai_agent")
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_openai import OpenAIEmbeddings
 
 # OpenAI native client for Memori integration
-from openai import OpenAI
+from openai import AsyncOpenAI
 
 # Session manager
-from session_manager import session_manager
+from session_manager import session_manager, TurnEntry
 
 # Load environment variables
 load_dotenv()
@@ -47,16 +59,21 @@ import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from app.config import settings
 
+# One client (and connection pool) for the whole process - Memori calls
+# get_memori_db repeatedly, and each MongoClient starts its own pool + monitor thread
+_mongo_client = MongoClient(settings.MONGO_URI, tlsAllowInvalidCertificates=True, maxPoolSize=50)
+
+
 def get_memori_db():
-    client = MongoClient(settings.MONGO_URI, tlsAllowInvalidCertificates=True)
-    return client.get_database("memori_interviews")
+    return _mongo_client.get_database("memori_interviews")
 
 
 
 app = FastAPI(
     title="AI Interview Agent",
     version="1.0.0",
-    description="AI-powered resume parsing and interview question generation"
+    description="AI-powered resume parsing and interview question generation",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -68,7 +85,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.on_event("shutdown")
+async def close_memori_db():
+    _mongo_client.close()
+
 # ==================== Pydantic Models ====================
+# Response models are frozen: they are built once per request and only serialized
+# (by ORJSONResponse, the app default)
 
 class ResumeData(BaseModel):
     """Extract candidate information from resume."""
@@ -77,7 +101,7 @@ class ResumeData(BaseModel):
     candidate_email: str = Field(description="Candidate's Email.")
     candidate_linkedin: str = Field(description="Candidate's LinkedIn.")
     experience: str = Field(description="Candidate's work experience.")
-    skills: list[str] = Field(description="Key skills for the candidate.")
+    skills: List[str] = Field(description="Key skills for the candidate.")
     seniority_level: str = Field(description="Seniority level: Fresher, Junior, Mid-Senior, Senior, Lead.")
 
 
@@ -88,6 +112,8 @@ class ParseResumeRequest(BaseModel):
 
 
 class ParseResumeResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     resumeProfile: Dict[str, Any]
 
 
@@ -98,6 +124,8 @@ class InitInterviewRequest(BaseModel):
 
 
 class InitInterviewResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     question: str
 
 
@@ -110,6 +138,8 @@ class NextQuestionRequest(BaseModel):
 
 
 class NextQuestionResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     nextQuestion: Optional[str]
     isComplete: bool = False  # True when interview is finished
     closingMessage: Optional[str] = None  # Farewell message when interview ends
@@ -135,6 +165,8 @@ class GenerateAssessmentRequest(BaseModel):
 
 
 class GenerateAssessmentResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     assessment: Dict[str, Any]
 
 
@@ -145,9 +177,24 @@ class GenerateAssessmentResponse(BaseModel):
 openai_client = None
 memori = None
 
+# One HTTP/2 keep-alive pool shared by every OpenAI client in this process, so
+# concurrent LLM calls multiplex over a few warm TLS connections
+shared_http = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=64),
+    # Fail fast on a dead connect instead of eating the whole 30s read budget
+    timeout=httpx.Timeout(30.0, connect=2.0)
+)
+
+
+@app.on_event("shutdown")
+async def close_shared_http():
+    await shared_http.aclose()
+
+
 try:
-    # Create native OpenAI client for Memori to track
-    openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    # Create native async OpenAI client for Memori to track
+    openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=shared_http)
     
     # Initialize Memori with MongoDB connection
     # Memori automatically picks up MEMORI_API_KEY from environment variables
@@ -162,27 +209,194 @@ try:
     
     logger.info("Memori memory layer initialized and OpenAI client registered successfully")
 except Exception as e:
-    logger.warning(f"Memori initialization failed: {e}. Continuing without memory layer.")
+    logger.warning("Memori initialization failed: %s. Continuing without memory layer.", e)
     memori = None
     # If Memori fails, still create a regular OpenAI client
     if openai_client is None:
-        openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=shared_http)
+
+
+@app.on_event("startup")
+async def prewarm_openai_connection():
+    """
+    Open the TLS/HTTP2 connection to the OpenAI API at startup so the first interview
+    turn doesn't pay the handshake. models.list() is free - no tokens are spent.
+    """
+    if not os.getenv("OPENAI_API_KEY"):
+        return
+    try:
+        await asyncio.wait_for(openai_client.models.list(), timeout=5.0)
+        logger.info("OpenAI connection pre-warmed")
+    except Exception as e:
+        logger.warning("OpenAI connection pre-warm failed: %s", e)
+
+
+class PromptCacheLogger(BaseCallbackHandler):
+    """Log how many prompt tokens were served from OpenAI's prompt cache."""
+
+    def on_llm_end(self, response, **kwargs):
+        try:
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    prompt_tokens = usage.get("input_tokens", 0)
+                    cached_tokens = (usage.get("input_token_details") or {}).get("cache_read", 0)
+                    if prompt_tokens:
+                        logger.info(
+                            "[PROMPT_CACHE] cached_tokens=%d/%d (%.0f%% hit)",
+                            cached_tokens, prompt_tokens, 100 * cached_tokens / prompt_tokens
+                        )
+        except Exception as e:
+            logger.debug("[PROMPT_CACHE] Could not read usage metadata: %s", e)
+
 
 # Note: LangChain ChatOpenAI creates its own internal client
 # Memori will track calls made through the registered openai_client directly
 llm = ChatOpenAI(
     model="gpt-4o-mini",
     temperature=0.7,
-    api_key=os.getenv("OPENAI_API_KEY")
+    api_key=os.getenv("OPENAI_API_KEY"),
+    callbacks=[PromptCacheLogger()],
+    extra_body={"prompt_cache_key": "interviewer-v1"},
+    http_async_client=shared_http
 )
 
-# Note: Embeddings not needed for current implementation, but keeping for future use
-embeddings = OpenAIEmbeddings() if os.getenv("OPENAI_API_KEY") else None
+# JSON-mode model for resume extraction, built once so the HTTP connection pool is reused
+llm_json = ChatOpenAI(
+    model="gpt-4o-mini",
+    temperature=0.3,  # Lower temperature for more consistent extraction
+    api_key=os.getenv("OPENAI_API_KEY"),
+    model_kwargs={"response_format": {"type": "json_object"}},
+    extra_body={"prompt_cache_key": "resume-parse-v1"},
+    http_async_client=shared_http
+)
+
+
+def with_prompt_cache_key(model, cache_key: str):
+    """
+    Bind an OpenAI `prompt_cache_key` so every call sharing the key is routed to
+    the same prefix-cache shard (e.g. all turns of one interview session).
+    
+    If we ever move to Anthropic, this is also where an explicit
+    `cache_control: {"type": "ephemeral"}` breakpoint belongs - on the last
+    static message (INTERVIEWER_STATIC_RULES / assessment system prompt),
+    right before the dynamic suffix.
+    """
+    # A shallow copy (rather than .bind) keeps the underlying HTTP clients and still
+    # supports .with_structured_output() on the result.
+    return model.model_copy(update={"extra_body": {"prompt_cache_key": cache_key}})
+
+# Used to rank resume chunks. text-embedding-3-small truncated to 512 dims (still
+# unit-length) halves payload and dot-product cost versus the 1536-dim default
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSIONS = 512
+
+embeddings = OpenAIEmbeddings(
+    model=EMBEDDING_MODEL,
+    dimensions=EMBEDDING_DIMENSIONS,
+    http_async_client=shared_http
+) if os.getenv("OPENAI_API_KEY") else None
 
 
 # ==================== Memori Storage Helper ====================
 
-def store_memory_via_llm(entity_id: str, memory_text: str, async_store: bool = True):
+# Memory writes are queued and drained by a small pool of worker coroutines so a
+# burst of concurrent interviews can't spawn unbounded OpenAI calls.
+MEMORY_WORKER_COUNT = 4
+MEMORY_QUEUE_MAXSIZE = 100
+MEMORY_BATCH_SIZE = 8          # Extra items drained per worker wake-up
+MEMORY_BATCH_WINDOW = 0.25     # Seconds to wait for more items before flushing
+
+memory_queue: Optional[asyncio.Queue] = None
+_memory_workers: List[asyncio.Task] = []
+
+
+async def _write_memory(entity_id: str, memory_text: str) -> None:
+    """Make the OpenAI call that Memori intercepts to extract facts."""
+    try:
+        memori.attribution(entity_id=entity_id, process_id="mock-interviewer")
+        # Make a simple completion that Memori will intercept and extract facts from
+        await openai_client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You are a memory storage assistant. Acknowledge the information provided."},
+                {"role": "user", "content": memory_text}
+            ],
+            max_tokens=50  # Keep response short since we don't need it
+        )
+        logger.info("[MEMORI] Stored memory for entity %.20s...", entity_id)
+    except Exception as e:
+        logger.warning("[MEMORI] Failed to store memory: %s", e)
+
+
+async def _memory_worker() -> None:
+    """
+    Consume queued memory writes until cancelled.
+    
+    After the first item arrives, keep draining for up to MEMORY_BATCH_WINDOW
+    seconds and merge texts for the same entity into one OpenAI call. Memori
+    attributes a call to a single entity, so batches are grouped per entity.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await memory_queue.get()]
+        deadline = loop.time() + MEMORY_BATCH_WINDOW
+        while len(batch) <= MEMORY_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(memory_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        
+        try:
+            grouped: Dict[str, List[str]] = {}
+            for entity_id, memory_text in batch:
+                grouped.setdefault(entity_id, []).append(memory_text)
+            for entity_id, texts in grouped.items():
+                await _write_memory(entity_id, "\n---\n".join(texts))
+        finally:
+            for _ in batch:
+                memory_queue.task_done()
+
+
+@app.on_event("startup")
+async def start_memory_workers():
+    global memory_queue
+    if not memori or not openai_client:
+        return
+    memory_queue = asyncio.Queue(maxsize=MEMORY_QUEUE_MAXSIZE)
+    _memory_workers.extend(
+        asyncio.create_task(_memory_worker()) for _ in range(MEMORY_WORKER_COUNT)
+    )
+    logger.info("[MEMORI] Started %s memory workers", MEMORY_WORKER_COUNT)
+
+
+_session_sweeper: Optional[asyncio.Task] = None
+
+
+@app.on_event("startup")
+async def start_session_sweeper():
+    global _session_sweeper
+    _session_sweeper = asyncio.create_task(session_manager.run_expiry_sweeper())
+
+
+@app.on_event("shutdown")
+async def stop_session_sweeper():
+    if _session_sweeper:
+        _session_sweeper.cancel()
+
+
+@app.on_event("shutdown")
+async def stop_memory_workers():
+    for worker in _memory_workers:
+        worker.cancel()
+    await asyncio.gather(*_memory_workers, return_exceptions=True)
+    _memory_workers.clear()
+
+
+async def store_memory_via_llm(entity_id: str, memory_text: str, async_store: bool = True):
     """
     Store a memory by making a simple OpenAI call that Memori can intercept.
     This triggers Memori's Advanced Augmentation to extract facts.
@@ -190,41 +404,127 @@ def store_memory_via_llm(entity_id: str, memory_text: str, async_store: bool = T
     Args:
         entity_id: Usually the session ID to attribute the memory to
         memory_text: The text containing facts to store
-        async_store: If True, run in background thread to avoid blocking
+        async_store: If True, enqueue for the background workers instead of waiting
     """
     if not memori or not openai_client:
         logger.debug("Memori not available, skipping memory storage")
         return
     
-    def _store():
+    if async_store and memory_queue is not None:
         try:
-            memori.attribution(entity_id=entity_id, process_id="mock-interviewer")
-            # Make a simple completion that Memori will intercept and extract facts from
-            openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a memory storage assistant. Acknowledge the information provided."},
-                    {"role": "user", "content": memory_text}
-                ],
-                max_tokens=50  # Keep response short since we don't need it
-            )
-            logger.info(f"[MEMORI] Stored memory for entity {entity_id[:20]}...")
-        except Exception as e:
-            logger.warning(f"[MEMORI] Failed to store memory: {e}")
+            memory_queue.put_nowait((entity_id, memory_text))
+        except asyncio.QueueFull:
+            logger.warning("[MEMORI] Memory queue full, dropping memory for entity %.20s...", entity_id)
+    else:
+        await _write_memory(entity_id, memory_text)
+
+
+# Recall filtering: only facts with reasonable similarity, trimmed for the prompt
+MEMORI_SIM_THRESHOLD = 0.25
+MEMORI_FACT_MAX_CHARS = 200
+MEMORI_MAX_FACTS = 5
+
+# Recall is skipped until this many questions have been asked - before that the
+# store holds nothing the prompt doesn't already have
+MIN_QUESTIONS_FOR_RECALL = 2
+
+
+# ==================== Redis Cache ====================
+
+# Kept short: Memori extracts facts asynchronously after the intercepted call, so
+# there is no reliable "memory written" moment to invalidate on - entries just age out
+RECALL_CACHE_TTL = 60
+FIRST_QUESTION_CACHE_TTL = 3600
+
+# Optional: only enabled when REDIS_URL is configured
+redis_client = None
+if settings.REDIS_URL:
+    try:
+        import redis.asyncio as aioredis
+        redis_client = aioredis.from_url(settings.REDIS_URL)
+        logger.info("Redis cache enabled for memory recall and first questions")
+    except Exception as e:
+        logger.warning("Redis initialization failed: %s. Continuing without cache.", e)
+        redis_client = None
+
+
+def _cache_digest(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+async def cache_get(key: str) -> Optional[str]:
+    """Read a cached string; cache errors are treated as a miss."""
+    if not redis_client:
+        return None
+    try:
+        cached = await redis_client.get(key)
+        return cached.decode() if cached is not None else None
+    except Exception as e:
+        logger.debug("[CACHE] Redis get failed for %s: %s", key, e)
+        return None
+
+
+async def cache_set(key: str, value: str, ttl: int) -> None:
+    """Write a cached string with a TTL; cache errors are ignored."""
+    if not redis_client:
+        return
+    try:
+        await redis_client.setex(key, ttl, value)
+    except Exception as e:
+        logger.debug("[CACHE] Redis set failed for %s: %s", key, e)
+
+
+# In-process LRU in front of Redis: (entity, query, limit) -> (expires_at, recall)
+RECALL_LRU_SIZE = 256
+_recall_lru: "OrderedDict[Tuple[str, str, int], Tuple[float, str]]" = OrderedDict()
+
+
+async def recall_memories(entity_id: str, query: str, limit: int = 5) -> str:
+    """
+    Recall relevant facts from Memori. Results are cached for RECALL_CACHE_TTL, so a
+    repeat query is served from process memory (or Redis) until the entry ages out.
+    """
+    if not memori:
+        return ""
     
-    if async_store:
-        import threading
-        thread = threading.Thread(target=_store, daemon=True)
-        thread.start()
+    lru_key = (entity_id, query, limit)
+    cached = _recall_lru.get(lru_key)
+    if cached is not None:
+        expires_at, recalled = cached
+        if expires_at > time.monotonic():
+            _recall_lru.move_to_end(lru_key)
+            logger.debug("[MEMORI] Recall LRU hit for entity %.20s...", entity_id)
+            return recalled
+        del _recall_lru[lru_key]
+    
+    key = f"rcl:{entity_id}:{limit}:{_cache_digest(query)}"
+    result = await cache_get(key)
+    if result is not None:
+        logger.debug("[MEMORI] Recall cache hit for entity %.20s...", entity_id)
     else:
-        _store()
+        result = await _recall_from_memori(entity_id, query, limit)
+        await cache_set(key, result, RECALL_CACHE_TTL)
+    
+    _recall_lru[lru_key] = (time.monotonic() + RECALL_CACHE_TTL, result)
+    if len(_recall_lru) > RECALL_LRU_SIZE:
+        _recall_lru.popitem(last=False)
+    return result
+
 
+def forget_recalls(entity_id: str) -> None:
+    """Drop cached recalls for an entity whose session has ended."""
+    for lru_key in [k for k in _recall_lru if k[0] == entity_id]:
+        del _recall_lru[lru_key]
 
-def recall_memories(entity_id: str, query: str, limit: int = 5) -> str:
+
+async def _recall_from_memori(entity_id: str, query: str, limit: int = 5) -> str:
     """
     Recall relevant facts from Memori using semantic search.
     Returns formatted string of memories to inject into prompts.
     
+    Memori's recall is blocking (Mongo + embeddings), so it runs in a worker
+    thread to keep the event loop free for other sessions.
+    
     Args:
         entity_id: The entity (session/user) to recall memories for
         query: Search query for semantic matching
@@ -236,51 +536,99 @@ def recall_memories(entity_id: str, query: str, limit: int = 5) -> str:
     if not memori:
         return ""
     
-    try:
+    def _recall():
+        # Attribution and recall must run in the same thread/context
         memori.attribution(entity_id=entity_id, process_id="mock-interviewer")
-        facts = memori.recall(query, limit=limit)
+        return memori.recall(query, limit=limit)
+    
+    try:
+        facts = await asyncio.to_thread(_recall)
         
         if not facts:
-            logger.debug(f"[MEMORI] No memories found for query: {query[:50]}...")
+            logger.debug("[MEMORI] No memories found for query: %.50s...", query)
             return ""
         
-        # Filter by similarity threshold and format
-        memories = []
-        for fact in facts:
-            similarity = fact.get('similarity', 0)
-            content = fact.get('content', '')
-            
-            # Only include facts with reasonable similarity
-            if similarity > 0.25 and content:
-                memories.append(f"• {content[:200]}")  # Limit length per fact
+        # Filter by similarity threshold, limit length per fact and cap the count in one pass
+        memories = [
+            f"• {fact['content'][:MEMORI_FACT_MAX_CHARS]}"
+            for fact in facts
+            if fact.get('similarity', 0) > MEMORI_SIM_THRESHOLD and fact.get('content')
+        ][:MEMORI_MAX_FACTS]
         
         if memories:
-            logger.info(f"[MEMORI] Recalled {len(memories)} relevant facts for entity {entity_id[:20]}...")
-            return "\n".join(memories[:5])  # Cap at 5 memories
+            logger.info("[MEMORI] Recalled %d relevant facts for entity %.20s...", len(memories), entity_id)
+            return "\n".join(memories)
         
         return ""
         
     except Exception as e:
-        logger.warning(f"[MEMORI] Recall failed: {e}")
+        logger.warning("[MEMORI] Recall failed: %s", e)
         return ""
 
 
 # ==================== Helper Functions ====================
 
+# Newline-like characters -> space, applied in one C-level pass by str.translate
+_WS_TABLE = str.maketrans({"\n": " ", "\r": " ", "\t": " "})
+
+
+def _clean_str(value):
+    return value.translate(_WS_TABLE).strip() if isinstance(value, str) else value
+
+
 def clean_dictionary(data):
     """Remove newlines and extra whitespace from dictionary values."""
-    clean_data = {}
-    for key, value in data.items():
-        if isinstance(value, str):
-            clean_data[key] = value.replace('\n', ' ').strip()
-        elif isinstance(value, list):
-            clean_data[key] = [v.replace('\n', ' ').strip() if isinstance(v, str) else v for v in value]
-        else:
-            clean_data[key] = value
-    return clean_data
+    return {
+        key: [_clean_str(v) for v in value] if isinstance(value, list) else _clean_str(value)
+        for key, value in data.items()
+    }
+
 
+# ==================== History Compression (optional) ====================
 
-def format_conversation_history(history: List[Dict[str, str]], keep_recent: int = 2) -> str:
+# LLMLingua-2 token pruning for older turns. Opt-in because it loads a ~2GB model:
+# set ENABLE_HISTORY_COMPRESSION=1 and `pip install llmlingua`.
+HISTORY_COMPRESSION_RATE = 0.33
+
+history_compressor = None
+if os.getenv("ENABLE_HISTORY_COMPRESSION", "").lower() in ("1", "true", "yes"):
+    try:
+        from llmlingua import PromptCompressor
+        history_compressor = PromptCompressor(
+            model_name="microsoft/llmlingua-2-xlm-roberta-large-meetingbank",
+            use_llmlingua2=True,
+            device_map="cpu"
+        )
+        logger.info("LLMLingua-2 history compression enabled")
+    except Exception as e:
+        logger.warning("History compression unavailable: %s. Continuing without it.", e)
+        history_compressor = None
+
+
+def compress_history(text: str, question: str = "", rate: float = HISTORY_COMPRESSION_RATE) -> Optional[str]:
+    """
+    Prune low-information tokens from transcript text with LLMLingua-2.
+    CPU-bound - call it off the event loop.
+    
+    Args:
+        text: Transcript to compress
+        question: What the next prompt is about (the latest answer), so related tokens are kept
+        rate: Target fraction of tokens to keep
+    
+    Returns:
+        Compressed text, or None if compression is disabled or failed
+    """
+    if not history_compressor or not text:
+        return None
+    try:
+        result = history_compressor.compress_prompt(text, question=question, rate=rate, force_tokens=["\n", "?"])
+        return result["compressed_prompt"]
+    except Exception as e:
+        logger.warning("[HISTORY] Compression failed: %s", e)
+        return None
+
+
+def format_conversation_history(history: List[Dict[str, str]], keep_recent: int = 2, question: str = "") -> str:
     """
     Format conversation history with rolling summary to reduce prompt size.
     Keeps recent Q&A verbatim, summarizes older exchanges.
@@ -290,6 +638,7 @@ def format_conversation_history(history: List[Dict[str, str]], keep_recent: int
     Args:
         history: List of {"question": str, "answer": str} dicts
         keep_recent: Number of recent Q&A pairs to keep in full
+        question: Focus for question-aware compression of the older pairs (the latest answer)
         
     Returns:
         Formatted string with summarized older history + full recent history
@@ -305,15 +654,20 @@ def format_conversation_history(history: List[Dict[str, str]], keep_recent: int
     older = history[:-keep_recent]
     recent = history[-keep_recent:]
     
-    # Create compact summary of older exchanges
-    topics_covered = []
-    for qa in older:
-        # Extract just the topic/theme of each question (first 40 chars)
-        q_summary = qa.get('question', '')[:40].strip()
-        if q_summary:
-            topics_covered.append(q_summary + "...")
-    
-    summary_text = f"[Earlier: {len(older)} questions covered topics: {', '.join(topics_covered)}]\n\n"
+    # Prefer a token-pruned version of the older exchanges when compression is enabled
+    compressed = compress_history(_format_full_history(older), question=question)
+    if compressed:
+        summary_text = f"[Earlier exchanges, compressed]\n{compressed}\n\n"
+    else:
+        # Create compact summary of older exchanges
+        topics_covered = []
+        for qa in older:
+            # Extract just the topic/theme of each question (first 40 chars)
+            q_summary = qa.get('question', '')[:40].strip()
+            if q_summary:
+                topics_covered.append(q_summary + "...")
+        
+        summary_text = f"[Earlier: {len(older)} questions covered topics: {', '.join(topics_covered)}]\n\n"
     
     # Add full recent exchanges
     summary_text += "RECENT EXCHANGES:\n"
@@ -327,7 +681,7 @@ def _format_full_history(history: List[Dict[str, str]]) -> str:
     lines = []
     for i, qa in enumerate(history, 1):
         q = qa.get('question', 'No question')
-        a = qa.get('answer', 'No answer')
+        a = qa.get('answer') or 'No answer yet'
         lines.append(f"Q{i}: {q}")
         lines.append(f"A{i}: {a}")
         lines.append("")
@@ -335,6 +689,8 @@ def _format_full_history(history: List[Dict[str, str]]) -> str:
 
 
 CLARIFY_TAG = "[CLARIFY]"
+# Anchored, so a match only ever inspects the start of the question
+_CLARIFY_TAG_RE = re.compile(r"\s*\[CLARIFY\]\s*", re.IGNORECASE)
 
 
 def is_clarifying_question(question: str) -> bool:
@@ -347,9 +703,7 @@ def is_clarifying_question(question: str) -> bool:
     Returns:
         True if this is a clarifying question that shouldn't count toward quota
     """
-    if not question:
-        return False
-    return question.strip().upper().startswith(CLARIFY_TAG)
+    return bool(question and _CLARIFY_TAG_RE.match(question))
 
 
 def strip_clarify_tag(question: str) -> str:
@@ -365,11 +719,9 @@ def strip_clarify_tag(question: str) -> str:
     if not question:
         return question
     
-    # Case-insensitive removal of the tag
-    stripped = question.strip()
-    if stripped.upper().startswith(CLARIFY_TAG):
-        stripped = stripped[len(CLARIFY_TAG):].strip()
-    return stripped
+    # Case-insensitive removal of a leading tag
+    match = _CLARIFY_TAG_RE.match(question)
+    return (question[match.end():] if match else question).strip()
 
 
 def get_relevant_resume_chunks(chunks: List[str], max_chunks: int = 3) -> str:
@@ -398,54 +750,114 @@ def get_relevant_resume_chunks(chunks: List[str], max_chunks: int = 3) -> str:
     
     return "\n\n".join(relevant)
 
-def is_repeat_request(text: Optional[str]) -> bool:
-    """
-    Heuristic to detect if the user's reply requests the agent to repeat the current question.
-    Returns True for phrases like "repeat", "can you repeat", "say that again", etc.
-    """
-    if not text:
-        return False
-    import re
-    t = text.strip().lower()
-    patterns = [
-        r"\brepeat\b",
-        r"say that again",
-        r"can you repeat",
-        r"could you repeat",
-        r"one more time",
-        r"please repeat",
-        r"again please",
-        r"what was the question",
-        r"what is the question",
-        r"repeat the question",
-    ]
-    for p in patterns:
-        if re.search(p, t):
-            return True
-    return False
 
+# Query used to pick the resume chunks most useful for interview questions
+RESUME_RELEVANCE_QUERY = "technical skills, work experience, projects and responsibilities"
 
 
+async def rank_resume_chunks(chunks: List[str], max_chunks: int = 3) -> List[str]:
+    """
+    Return the max_chunks resume chunks most similar to RESUME_RELEVANCE_QUERY, best first.
+    
+    All chunks (plus the query) are embedded in ONE batched request. Falls back to
+    the original order when there are few chunks or embeddings are unavailable.
+    """
+    if not embeddings or len(chunks) <= max_chunks:
+        return chunks
+    
+    try:
+        vectors = await embeddings.aembed_documents([RESUME_RELEVANCE_QUERY, *chunks])
+    except Exception as e:
+        logger.warning("[RESUME_CONTEXT] Chunk ranking failed, using original order: %s", e)
+        return chunks
+    
+    # OpenAI embeddings are unit-length, so the dot product is the cosine similarity:
+    # one (N, D) @ (D,) product, then a partial sort for the top-k only
+    matrix = np.asarray(vectors, dtype=np.float32)
+    scores = matrix[1:] @ matrix[0]
+    top = np.argpartition(-scores, max_chunks)[:max_chunks]
+    top = top[np.argsort(-scores[top])]
+    return [chunks[i] for i in top]
+
 
-def parse_resume_from_chunks(resume_text: str, chunks: List[str]) -> Dict[str, Any]:
+async def get_session_resume_context(session_id: str, chunks: List[str]) -> Tuple[str, str]:
     """
-    Parse resume from text chunks and extract candidate information using LLM.
+    Get the resume context for a session, computing it only on the first call.
     
-    Args:
-        resume_text: Full extracted resume text
-        chunks: List of text chunks from the resume
-        
     Returns:
-        Dictionary with candidate information
+        (resume_context, prompt_cache_key) - the key includes a hash of the resume
+        context so the cached OpenAI prefix stays valid across turns
     """
-    start_time = time.time()
-    logger.info("[RESUME_PARSE] Starting resume extraction...")
-    
+    resume_context = session_manager.get_resume_context(session_id)
+    if resume_context is None:
+        resume_context = get_relevant_resume_chunks(await rank_resume_chunks(chunks, max_chunks=3), max_chunks=3)
+        session_manager.set_resume_context(session_id, resume_context)
+    digest = hashlib.blake2b(resume_context.encode(), digest_size=8).hexdigest()
+    return resume_context, f"{session_id}-{digest}"
+
+
+def sse_frame(payload: Dict[str, Any]) -> bytes:
+    """Encode one Server-Sent Events frame; orjson writes bytes StreamingResponse sends as-is."""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+# Single precompiled alternation of all repeat phrases. "\brepeat\b" already covers
+# "can/could/please repeat" and "repeat the question".
+_REPEAT_RE = re.compile(
+    r"\brepeat\b|say that again|one more time|again please|what (?:was|is) the question",
+    re.IGNORECASE
+)
+
+
+def is_repeat_request(text: Optional[str]) -> bool:
+    """
+    Heuristic to detect if the user's reply requests the agent to repeat the current question.
+    Returns True for phrases like "repeat", "can you repeat", "say that again", etc.
+    """
+    return bool(text and _REPEAT_RE.search(text))
+
+
+# Resume text sent for extraction is capped by tokens (not characters) so the prompt
+# size is predictable for non-ASCII resumes too
+RESUME_PROMPT_MAX_TOKENS = 3000
+
+try:
+    _resume_encoding = tiktoken.encoding_for_model("gpt-4o-mini")
+except Exception as e:
+    logger.warning("tiktoken encoding unavailable (%s); falling back to character truncation", e)
+    _resume_encoding = None
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to at most max_tokens model tokens (~4 chars/token fallback)."""
+    if _resume_encoding is None:
+        return text[:max_tokens * 4]
+    tokens = _resume_encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return _resume_encoding.decode(tokens[:max_tokens])
+
+
+# Returned instead of crashing when extraction fails
+FALLBACK_RESUME_PROFILE = {
+    "candidate_first_name": "unknown",
+    "candidate_last_name": "unknown",
+    "name": "Unknown Candidate",
+    "email": "unknown",
+    "linkedin": "unknown",
+    "experience": "Could not extract experience",
+    "skills": [],
+    "seniority_level": "Junior"
+}
+
+
+def build_resume_prompt(resume_text: str) -> str:
+    """Build the JSON-mode extraction prompt for a single resume."""
     # Improved prompt with XML delimiters and explicit fallback rules
-    prompt = f"""Extract candidate information from the resume below.
+    return f"""Extract candidate information from the resume below.
 
 <RESUME>
-{resume_text[:8000]}
+{truncate_to_tokens(resume_text, RESUME_PROMPT_MAX_TOKENS)}
 </RESUME>
 
 EXTRACTION RULES:
@@ -472,65 +884,103 @@ Return a JSON object with EXACTLY these fields:
 }}
 
 Return ONLY valid JSON, no other text."""
+
+
+def build_resume_profile(result_json: Dict[str, Any]) -> Dict[str, Any]:
+    """Map the LLM's JSON output to a cleaned resume profile with safe fallbacks."""
+    profile = {
+        "candidate_first_name": result_json.get('candidate_first_name', 'unknown'),
+        "candidate_last_name": result_json.get('candidate_last_name', 'unknown'),
+        "name": f"{result_json.get('candidate_first_name', 'unknown')} {result_json.get('candidate_last_name', 'unknown')}",
+        "email": result_json.get('candidate_email', 'unknown').lower() if result_json.get('candidate_email') else 'unknown',
+        "linkedin": result_json.get('candidate_linkedin', 'unknown'),
+        "experience": result_json.get('experience', 'No experience information available'),
+        "skills": result_json.get('skills', [])[:15],  # Cap at 15 skills
+        "seniority_level": result_json.get('seniority_level', 'Junior')
+    }
+    return clean_dictionary(profile)
+
+
+async def parse_resume_from_chunks(resume_text: str, chunks: List[str]) -> Dict[str, Any]:
+    """
+    Parse resume from text chunks and extract candidate information using LLM.
     
-    try:
-        # Use JSON mode with OpenAI
-        llm_json = ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.3,  # Lower temperature for more consistent extraction
-            api_key=os.getenv("OPENAI_API_KEY"),
-            model_kwargs={"response_format": {"type": "json_object"}}
-        )
+    Args:
+        resume_text: Full extracted resume text
+        chunks: List of text chunks from the resume
         
-        response = llm_json.invoke(prompt)
-        result_json = json.loads(response.content)
-        
-        # Safely extract with fallbacks
-        profile = {
-            "candidate_first_name": result_json.get('candidate_first_name', 'unknown'),
-            "candidate_last_name": result_json.get('candidate_last_name', 'unknown'),
-            "name": f"{result_json.get('candidate_first_name', 'unknown')} {result_json.get('candidate_last_name', 'unknown')}",
-            "email": result_json.get('candidate_email', 'unknown').lower() if result_json.get('candidate_email') else 'unknown',
-            "linkedin": result_json.get('candidate_linkedin', 'unknown'),
-            "experience": result_json.get('experience', 'No experience information available'),
-            "skills": result_json.get('skills', [])[:15],  # Cap at 15 skills
-            "seniority_level": result_json.get('seniority_level', 'Junior')
-        }
+    Returns:
+        Dictionary with candidate information
+    """
+    start_time = time.time()
+    logger.info("[RESUME_PARSE] Starting resume extraction...")
+    
+    prompt = build_resume_prompt(resume_text)
+    
+    try:
+        response = await llm_json.ainvoke(prompt)
+        profile = build_resume_profile(orjson.loads(response.content))
         
         elapsed = time.time() - start_time
-        logger.info(f"[RESUME_PARSE] Completed in {elapsed:.2f}s | Skills: {len(profile['skills'])} | Seniority: {profile['seniority_level']}")
+        logger.info("[RESUME_PARSE] Completed in %.2fs | Skills: %d | Seniority: %s", elapsed, len(profile['skills']), profile['seniority_level'])
         
-        return clean_dictionary(profile)
+        return profile
         
     except Exception as e:
         elapsed = time.time() - start_time
-        logger.error(f"[RESUME_PARSE] Failed after {elapsed:.2f}s: {str(e)}")
+        logger.error("[RESUME_PARSE] Failed after %.2fs: %s", elapsed, e)
         
         # Return fallback profile instead of crashing
-        return {
-            "candidate_first_name": "unknown",
-            "candidate_last_name": "unknown",
-            "name": "Unknown Candidate",
-            "email": "unknown",
-            "linkedin": "unknown",
-            "experience": "Could not extract experience",
-            "skills": [],
-            "seniority_level": "Junior"
-        }
+        return dict(FALLBACK_RESUME_PROFILE)
 
 
-# ==================== Interview Prompt ====================
-
-interviewer_prompt = ChatPromptTemplate.from_messages([
-    ("system", """
-    You are a friendly, experienced technical interviewer conducting a {max_questions}-question interview.
+async def parse_resume_batched(resumes: List[str], max_concurrency: int = 8) -> List[Dict[str, Any]]:
+    """
+    Parse several resumes at once with a single batched LLM call.
     
-    CANDIDATE PROFILE:
-    - Seniority Level: {seniority_level}
-    - Resume Context: {resume_chunks}
+    Args:
+        resumes: Full extracted text of each resume
+        max_concurrency: Maximum concurrent OpenAI requests
+        
+    Returns:
+        One profile per resume, in input order (fallback profile for failures)
+    """
+    start_time = time.time()
+    logger.info("[RESUME_PARSE] Starting batched extraction of %d resumes...", len(resumes))
     
-    RECALLED MEMORIES (facts from earlier in this interview or previous sessions):
-    {recalled_memories}
+    prompts = [build_resume_prompt(text) for text in resumes]
+    responses = await llm_json.abatch(
+        prompts,
+        config={"max_concurrency": max_concurrency},
+        return_exceptions=True
+    )
+    
+    profiles = []
+    for response in responses:
+        try:
+            if isinstance(response, Exception):
+                raise response
+            profiles.append(build_resume_profile(orjson.loads(response.content)))
+        except Exception as e:
+            logger.error("[RESUME_PARSE] Batched extraction failed for one resume: %s", e)
+            profiles.append(dict(FALLBACK_RESUME_PROFILE))
+    
+    elapsed = time.time() - start_time
+    logger.info("[RESUME_PARSE] Batched extraction of %d resumes completed in %.2fs", len(resumes), elapsed)
+    return profiles
+
+
+# ==================== Interview Prompt ====================
+
+# Static instructions are kept free of template variables so the prompt prefix is
+# byte-identical across every call in (and across) sessions. OpenAI only applies
+# automatic prompt caching to a stable prefix of 1024+ tokens, so anything that
+# changes per session or per turn must come AFTER this block.
+INTERVIEWER_STATIC_RULES = """
+    You are a friendly, experienced technical interviewer conducting a structured voice interview.
+    The candidate profile, resume context and question budget for this interview are provided in
+    the SESSION CONTEXT message. The current progress, recalled memories and conversation history
+    are provided in the INTERVIEW STATUS message.
     
     MEMORY INTELLIGENCE RULES (VERY IMPORTANT):
 
@@ -588,13 +1038,13 @@ interviewer_prompt = ChatPromptTemplate.from_messages([
     
     QUESTION PLANNING RULE (IMPORTANT):
     - Decide the category of the next question BEFORE writing it
-    - Use this mapping based on {total_questions_asked}:
+    - Use this mapping based on the number of Questions Asked so far:
     - Questions 1 to 2 → Experience / Background
     - Questions 3 to 4 → Technical (resume-based)
     - Questions 5 to 6 → Problem-solving
     - Final question → Behavioral / reflection
     - When the interview has MORE than 7 QUESTIONS, try to ask questions from technical, problem-solving areas only. The end question should always be behavioral/reflection. 
-    - If {max_questions} < 7, still include AT LEAST one question from each category
+    - If Max Questions is less than 7, still include AT LEAST one question from each category
 
 
     CONVERSATION FLOW RULES:
@@ -619,47 +1069,63 @@ interviewer_prompt = ChatPromptTemplate.from_messages([
                                                     "[CLARIFY] No worries! How about we try a simpler version - have you worked with...?"
                                                     "[CLARIFY] I'd like to hear more about that. Can you elaborate?"
     
+    ANALYZING THE LAST ANSWER:
+    - If the last question was [CLARIFY] and the answer is still brief/vague → Move to a new topic (NO [CLARIFY] tag)
+    - If the last answer was very brief (under 5 words) → Ask a [CLARIFY] question for elaboration
+    - If the last answer was strong and detailed → Move to a new topic (NO [CLARIFY] tag)
+    - [CLARIFY] questions do NOT count toward the main question count
+    - Maximum 1 clarifying follow-ups per original question
+    
     CRITICAL RULES:
     - Strictly adhere to the question variety rules given to you. The interview must contain questions from all areas mentioned under "QUESTION VARIETY" section, with Technical and Experience-based questions making up the majority of the interview.
     
-    
-            
-    
-    - The second question you ask (when total_questions_asked == 1) should start with {candidate_first_name} (if available). Some examples, which can be used are: 
-            *"Thanks, {candidate_first_name}. Can you elaborate on..."
-            *"Great to meet you, {candidate_first_name}. Let's dive into..."
-            *"Nice to hear that, {candidate_first_name}. Could you tell me more about..."
+    - The second question you ask (when Questions Asked is 1) should start with the candidate's first name (if available). Some examples, which can be used are: 
+            *"Thanks, <first name>. Can you elaborate on..."
+            *"Great to meet you, <first name>. Let's dive into..."
+            *"Nice to hear that, <first name>. Could you tell me more about..."
 
     - Never repeat questions unless it's a clarifying follow-up
     - Reference specific items from their resume when possible
     - Ask open-ended questions that encourage detailed answers
     - Keep questions conversational and natural for voice
-    
+    - Generate ONLY the next question, under 25 words
+    - Avoid repeating previous topics unless a concise follow-up is required to clarify or deepen an earlier answer
+    """
+
+interviewer_prompt = ChatPromptTemplate.from_messages([
+    # 1. Fully static - identical for every call, forms the cacheable prefix
+    ("system", INTERVIEWER_STATIC_RULES),
+
+    # 2. Stable within a session - extends the cached prefix across turns
+    ("system", """
+    SESSION CONTEXT:
+    - Seniority Level: {seniority_level}
+    - Candidate First Name: {candidate_first_name}
+    - Max Questions: {max_questions}
+    - Resume Context:
+    {resume_chunks}
     """),
 
+    # 3. Changes every turn - always last, so nothing volatile breaks the cached prefix
     ("human", """
     INTERVIEW STATUS:
     Questions Asked: {total_questions_asked} / {max_questions}
 
+    RECALLED MEMORIES (facts from earlier in this interview or previous sessions):
+    {recalled_memories}
+
     CONVERSATION HISTORY:
     {chat_history}
 
+    LAST EXCHANGE:
+    Question: {last_question}
+    Answer: {last_answer}
+
     INSTRUCTION:
     Generate ONLY the next question.
     Make it conversational and natural for voice.
-    Avoid repeating previous topics unless a concise follow-up is required to clarify or deepen an earlier answer.
-    
-    ANALYZING THE LAST ANSWER:
-    - If the last question was [CLARIFY] and the answer is still brief/vague → Move to a new topic (NO [CLARIFY] tag)
-    - If the last answer was very brief (under 5 words) → Ask a [CLARIFY] question for elaboration
-    - If the last answer was strong and detailed → Move to a new topic (NO [CLARIFY] tag)
-    
-    REMEMBER: 
-    - [CLARIFY] questions do NOT count toward the main question count
-    - Maximum 1 clarifying follow-ups per original question
-    - Keep questions under 25 words
     """)
-])
+]).partial(last_question="None yet", last_answer="None yet")
 
 
 # ==================== Assessment Prompt ====================
@@ -735,7 +1201,141 @@ assessment_prompt = ChatPromptTemplate.from_messages([
 ])
 
 
-def generate_first_question(session_id: str, chunks: List[str], seniority_level: str, max_questions: int, candidate_first_name: str = "Candidate") -> str:
+# ==================== Compiled Chains ====================
+
+@lru_cache(maxsize=256)
+def get_interview_chain(cache_key: str):
+    """
+    Build the interviewer pipeline once per prompt cache key and reuse it.
+    Keys are per session/resume, so the LRU bound keeps memory flat.
+    """
+    return interviewer_prompt | with_prompt_cache_key(llm, cache_key) | StrOutputParser()
+
+
+# Structured-output chains keyed by schema class
+_assessment_chains: Dict[type, Any] = {}
+
+
+def get_assessment_chain(schema: type = InterviewAssessment):
+    """Return the cached assessment_prompt | structured LLM chain for a schema."""
+    chain = _assessment_chains.get(schema)
+    if chain is None:
+        # The assessment system prompt is identical for every session, so one key
+        # lets OpenAI reuse the cached prefix across candidates
+        structured_assessor = with_prompt_cache_key(llm, "assessment-v1").with_structured_output(schema)
+        chain = assessment_prompt | structured_assessor
+        _assessment_chains[schema] = chain
+    return chain
+
+
+# ==================== Rolling History Summary ====================
+
+# Once more than HISTORY_SUMMARY_TRIGGER older turns are unsummarized, they are folded
+# into a per-session summary in the background, so the prompt history stays bounded
+# at summary + a handful of verbatim turns however long the interview runs
+HISTORY_SUMMARY_KEEP_RECENT = 2
+HISTORY_SUMMARY_TRIGGER = 4
+
+history_summary_prompt = ChatPromptTemplate.from_messages([
+    ("system", """
+    You maintain a running summary of a job interview for the interviewer.
+    Merge the new exchanges into the existing summary. Keep topics covered, concrete
+    skills, technologies, projects and notable strengths or gaps in the answers.
+    Use at most 120 words. Output only the updated summary.
+    """),
+    ("human", """
+    EXISTING SUMMARY:
+    {summary}
+
+    NEW EXCHANGES:
+    {exchanges}
+    """)
+])
+
+history_summary_chain = history_summary_prompt | with_prompt_cache_key(llm, "history-summary-v1") | StrOutputParser()
+
+# One in-flight summary task per session (also keeps a reference so it isn't GC'd)
+_summary_tasks: Dict[str, asyncio.Task] = {}
+
+
+async def _summarize_history(session_id: str) -> None:
+    """Fold the turns between the covered index and the recent window into the summary."""
+    conversation = session_manager.get_conversation_history(session_id)
+    summary, covered = session_manager.get_history_summary(session_id)
+    up_to = len(conversation) - HISTORY_SUMMARY_KEEP_RECENT
+    if up_to - covered < HISTORY_SUMMARY_TRIGGER:
+        return
+    
+    try:
+        new_summary = await history_summary_chain.ainvoke({
+            "summary": summary or "None yet.",
+            "exchanges": _format_full_history(conversation[covered:up_to])
+        })
+        session_manager.set_history_summary(session_id, new_summary.strip(), up_to)
+        logger.info("[%s] History summary now covers %s turns", session_id, up_to)
+    except Exception as e:
+        logger.warning("[%s] History summary failed: %s", session_id, e)
+
+
+def schedule_history_summary(session_id: str) -> None:
+    """Start a background summary update when enough unsummarized turns have piled up."""
+    if session_id in _summary_tasks:
+        return
+    _, covered = session_manager.get_history_summary(session_id)
+    turns = len(session_manager.get_conversation_history_ref(session_id))
+    if turns - HISTORY_SUMMARY_KEEP_RECENT - covered < HISTORY_SUMMARY_TRIGGER:
+        return
+    task = asyncio.create_task(_summarize_history(session_id))
+    _summary_tasks[session_id] = task
+    task.add_done_callback(lambda _: _summary_tasks.pop(session_id, None))
+
+
+def get_summarized_history(session_id: str, conversation: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Summary of older turns plus the unsummarized tail verbatim, or None when no
+    summary has been produced yet.
+    """
+    summary, covered = session_manager.get_history_summary(session_id)
+    if not summary:
+        return None
+    return f"[Summary of earlier exchanges]\n{summary}\n\nRECENT EXCHANGES:\n{_format_full_history(conversation[covered:])}"
+
+
+async def build_history_context(session_id: str, conversation: List[Dict[str, Any]]) -> str:
+    """
+    Prompt-ready transcript for the next question - the one history builder behind
+    /next-question, its pre-generation and /next-question-stream.
+    
+    Args:
+        session_id: Session identifier
+        conversation: Snapshot of the session's conversation history
+    
+    Returns:
+        Rolling summary + recent turns once a summary exists; otherwise older turns
+        compressed around the latest answer (LLMLingua-2, if enabled) with the last 2
+        verbatim; otherwise the session's incrementally built transcript
+    """
+    summarized = get_summarized_history(session_id, conversation)
+    if summarized:
+        # Cached LLM summary of older turns + the few turns since - bounded size
+        return summarized
+    
+    last_qa = conversation[-1] if conversation else {}
+    last_question = last_qa.get("question", "")
+    last_answer = last_qa.get("answer") or ""
+    if history_compressor and len(conversation) > 2:
+        # Model inference, so off the event loop
+        return await asyncio.to_thread(format_conversation_history, conversation, 2, last_answer)
+    
+    # Transcript of answered Q&A is appended once per turn by the session manager
+    # instead of being rebuilt from the full history every call
+    history = session_manager.get_history_text(session_id)
+    if last_question and not last_answer:
+        history += f"Pending question (not answered yet): {last_question}\n"
+    return history or "No previous conversation."
+
+
+async def generate_first_question(session_id: str, chunks: List[str], seniority_level: str, max_questions: int, candidate_first_name: str = "Candidate") -> str:
     """
     Generate the first interview question based on candidate profile and resume chunks.
     
@@ -749,20 +1349,22 @@ def generate_first_question(session_id: str, chunks: List[str], seniority_level:
         First interview question as string
     """
     start_time = time.time()
-    logger.info(f"[{session_id}] Generating first question for {seniority_level}...")
+    logger.info("[%s] Generating first question for %s...", session_id, seniority_level)
     
-    # Create interview chain
-    interview_chain = interviewer_prompt | llm | StrOutputParser()
+    # No memory recall here: the only memory so far is the candidate profile, which
+    # the resume context below already carries
+    # Use optimized resume context (limited chunks, computed once per session)
+    resume_context, cache_key = await get_session_resume_context(session_id, chunks)
     
-    # Use optimized resume context (limited chunks to reduce tokens)
-    resume_context = get_relevant_resume_chunks(chunks, max_chunks=3)
+    # Near-identical resumes at the same level get the same opening question
+    question_cache_key = f"q1:{seniority_level}:{max_questions}:{_cache_digest(resume_context)}"
+    cached_question = await cache_get(question_cache_key)
+    if cached_question:
+        logger.info("[%s] First question served from cache in %.2fs", session_id, time.time() - start_time)
+        return cached_question
     
-    # Recall relevant memories for first question
-    recalled = recall_memories(
-        entity_id=session_id,
-        query=f"candidate profile background skills {seniority_level}",
-        limit=3
-    )
+    # Create interview chain (session-scoped cache key keeps turns on one cache shard)
+    interview_chain = get_interview_chain(cache_key)
 
     # Generate first question
     context = {
@@ -772,34 +1374,33 @@ def generate_first_question(session_id: str, chunks: List[str], seniority_level:
         "chat_history": "No previous conversation.",
         "resume_chunks": resume_context,
         "candidate_first_name": candidate_first_name,
-        "recalled_memories": recalled if recalled else "No previous memories."
+        "recalled_memories": "No previous memories."
     }
     
     try:
-        question = interview_chain.invoke(context)
+        question = (await interview_chain.ainvoke(context)).strip()
         elapsed = time.time() - start_time
-        logger.info(f"[{session_id}] First question generated in {elapsed:.2f}s")
-        return question.strip()
+        logger.info("[%s] First question generated in %.2fs", session_id, elapsed)
+        await cache_set(question_cache_key, question, FIRST_QUESTION_CACHE_TTL)
+        return question
     except Exception as e:
         elapsed = time.time() - start_time
-        logger.error(f"[{session_id}] First question failed after {elapsed:.2f}s: {e}")
+        logger.error("[%s] First question failed after %.2fs: %s", session_id, elapsed, e)
         return "Tell me about yourself and your background in technology."
 
 
-def generate_next_question(
+async def generate_next_question(
     session_id: str,
     chunks: List[str],
     seniority_level: str,
     max_questions: int,
     questions_asked: int,
-    chat_history: str,
-    conversation_history: List[Dict[str, str]] = None,
     candidate_first_name: str = "Candidate"
 ) -> Optional[str]:
     """
     Generate the next interview question based on previous Q&A and resume chunks.
     
-    Uses rolling conversation summary to reduce prompt size by 25-40%.
+    History comes from build_history_context (rolling summary / compression keep it bounded).
     
     Args:
         session_id: Session identifier
@@ -807,8 +1408,7 @@ def generate_next_question(
         seniority_level: Candidate's seniority level
         max_questions: Maximum questions for this interview
         questions_asked: Number of questions already asked
-        chat_history: Full transcript of previous Q&A (used if conversation_history not provided)
-        conversation_history: Structured list of Q&A dicts (preferred)
+        candidate_first_name: Candidate's first name for the prompt
         
     Returns:
         Next question or None if interview should end
@@ -817,24 +1417,11 @@ def generate_next_question(
     
     # ENFORCE max questions in code (don't rely on LLM)
     if questions_asked >= max_questions:
-        logger.info(f"[{session_id}] Interview complete - reached {max_questions} questions")
+        logger.info("[%s] Interview complete - reached %s questions", session_id, max_questions)
         return None
     
-    logger.info(f"[{session_id}] Generating question {questions_asked + 1}/{max_questions}...")
-    
-    # Create interview chain
-    interview_chain = interviewer_prompt | llm | StrOutputParser()
-    
-    # OPTIMIZATION 1: Use limited resume chunks (not all)
-    resume_context = get_relevant_resume_chunks(chunks, max_chunks=3)
+    logger.info("[%s] Generating question %s/%s...", session_id, questions_asked + 1, max_questions)
     
-    # OPTIMIZATION 2: Use rolling conversation summary if we have structured history
-    if conversation_history:
-        formatted_history = format_conversation_history(conversation_history, keep_recent=2)
-    else:
-        # Fallback to raw chat_history (less optimized)
-        formatted_history = chat_history if chat_history else "No previous conversation."
-
     # Also provide the most recent Q/A explicitly so the model can focus follow-ups
     try:
         conv_full = session_manager.get_conversation_history(session_id)
@@ -851,12 +1438,25 @@ def generate_next_question(
 
     # Recall relevant memories based on current context
     # We query for skills/experience related to the last answer or general seniority
+    # Started as a task so the Mongo round-trip overlaps prompt assembly below
+    # Skipped for the first turns, when the store holds little beyond the resume profile
     query_text = f"{seniority_level} skills experience {last_answer[:50]}"
-    recalled = recall_memories(
+    recall_task = asyncio.create_task(recall_memories(
         entity_id=session_id,
         query=query_text,
         limit=5
-    )
+    )) if questions_asked >= MIN_QUESTIONS_FOR_RECALL else None
+    
+    # OPTIMIZATION 1: Use limited resume chunks (not all), computed once per session
+    resume_context, cache_key = await get_session_resume_context(session_id, chunks)
+    
+    # Create interview chain (session-scoped cache key keeps turns on one cache shard)
+    interview_chain = get_interview_chain(cache_key)
+    
+    # OPTIMIZATION 2: Bounded history (summary / compression / cached transcript)
+    formatted_history = await build_history_context(session_id, conv_full or [])
+    
+    recalled = await recall_task if recall_task else ""
 
     # Generate next question
     context = {
@@ -864,29 +1464,31 @@ def generate_next_question(
         "max_questions": max_questions,
         "total_questions_asked": questions_asked,
         "chat_history": formatted_history,
-        "last_question": last_question,
-        "last_answer": last_answer,
+        "last_question": last_question or "None yet",
+        "last_answer": last_answer or "No answer yet",
         "resume_chunks": resume_context,
         "candidate_first_name": candidate_first_name,
         "recalled_memories": recalled if recalled else "No previous memories."
     }
     
     try:
-        question = interview_chain.invoke(context)
+        question = await interview_chain.ainvoke(context)
         question = question.strip()
         
         # VALIDATION: Ensure question isn't too long (for voice)
         if len(question) > 200:
-            question = question[:200].rsplit(' ', 1)[0] + "?"
-            logger.warning(f"[{session_id}] Question truncated to 200 chars")
+            # Cut at the last space before the limit (reverse scan, no list allocation)
+            cut = question.rfind(' ', 0, 200)
+            question = (question[:cut] if cut > 0 else question[:200]) + "?"
+            logger.warning("[%s] Question truncated to 200 chars", session_id)
         
         elapsed = time.time() - start_time
-        logger.info(f"[{session_id}] Question {questions_asked + 1} generated in {elapsed:.2f}s")
+        logger.info("[%s] Question %s generated in %.2fs", session_id, questions_asked + 1, elapsed)
         return question
         
     except Exception as e:
         elapsed = time.time() - start_time
-        logger.error(f"[{session_id}] Question generation failed after {elapsed:.2f}s: {e}")
+        logger.error("[%s] Question generation failed after %.2fs: %s", session_id, elapsed, e)
         
         # Fallback question instead of crash
         fallback_questions = [
@@ -899,43 +1501,58 @@ def generate_next_question(
         return random.choice(fallback_questions)
 
 
-def stream_next_question(
+async def stream_next_question(
     session_id: str,
     chunks: List[str],
     seniority_level: str,
     max_questions: int,
     questions_asked: int,
-    chat_history: str
+    candidate_first_name: str = "Candidate"
 ):
     """
-    Stream the next interview question word-by-word for faster perceived response.
-    Returns a generator that yields text chunks.
+    Stream the next interview question token-by-token for faster perceived response.
+    Returns an async generator that yields text chunks, so StreamingResponse
+    iterates it on the event loop instead of a threadpool worker.
     """
-    from langchain_core.output_parsers import StrOutputParser
-    
     # Check if interview should end
     if questions_asked >= max_questions:
-        return None
+        return
+    
+    recall_task = asyncio.create_task(recall_memories(
+        entity_id=session_id,
+        query=f"{seniority_level} skills experience",
+        limit=5
+    )) if questions_asked >= MIN_QUESTIONS_FOR_RECALL else None
+    
+    resume_context, cache_key = await get_session_resume_context(session_id, chunks)
     
-    # Create interview chain
-    interview_chain = interviewer_prompt | llm | StrOutputParser()
+    # Create interview chain (session-scoped cache key keeps turns on one cache shard)
+    interview_chain = get_interview_chain(cache_key)
     
-    resume_context = "\n\n".join(chunks)
+    # Same history builder as /next-question, so both endpoints see the same transcript
+    conversation = session_manager.get_conversation_history(session_id)
+    history = await build_history_context(session_id, conversation)
+    last_qa = conversation[-1] if conversation else {}
+    
+    recalled = await recall_task if recall_task else ""
     
     context = {
         "seniority_level": seniority_level,
         "max_questions": max_questions,
         "total_questions_asked": questions_asked,
-        "chat_history": chat_history,
-        "resume_chunks": resume_context
+        "chat_history": history,
+        "last_question": last_qa.get("question") or "None yet",
+        "last_answer": last_qa.get("answer") or "No answer yet",
+        "resume_chunks": resume_context,
+        "candidate_first_name": candidate_first_name,
+        "recalled_memories": recalled if recalled else "No previous memories."
     }
     
     # Stream the response
-    for chunk in interview_chain.stream(context):
+    async for chunk in interview_chain.astream(context):
         yield chunk
 
 
-
 # ==================== API Endpoints ====================
 
 @app.get("/")
@@ -959,22 +1576,18 @@ async def parse_resume(request: ParseResumeRequest):
         Parsed resume profile with candidate information
     """
     try:
-        print(f"[DEBUG] Received resume parse request for user: {request.userId}")
-        print(f"[DEBUG] Resume text length: {len(request.resumeText)} characters")
-        print(f"[DEBUG] Number of chunks: {len(request.chunks)}")
+        logger.debug("Received resume parse request for user: %s (%d characters, %d chunks)",
+                     request.userId, len(request.resumeText), len(request.chunks))
         
         # Parse resume from chunks
-        resume_profile = parse_resume_from_chunks(request.resumeText, request.chunks)
+        resume_profile = await parse_resume_from_chunks(request.resumeText, request.chunks)
         
-        print(f"[DEBUG] Resume parsed successfully")
-        print(f"[DEBUG] Extracted profile: {resume_profile}")
+        logger.debug("Resume parsed successfully: %s", resume_profile)
         
         return ParseResumeResponse(resumeProfile=resume_profile)
         
     except Exception as e:
-        import traceback
-        print(f"[ERROR] Exception occurred while parsing resume:")
-        print(traceback.format_exc())
+        logger.exception("Exception occurred while parsing resume")
         raise HTTPException(status_code=500, detail=f"Error parsing resume: {str(e)}")
 
 
@@ -988,10 +1601,8 @@ async def init_interview(request: InitInterviewRequest):
     2. Parse resume and generate first real question in background
     3. First question is ready when user finishes answering intro
     """
-    import asyncio
-    
     try:
-        print(f"[DEBUG] Initializing interview for session: {request.sessionId}")
+        logger.debug("Initializing interview for session: %s", request.sessionId)
 
         if memori:
             memori.attribution(
@@ -1021,8 +1632,7 @@ async def init_interview(request: InitInterviewRequest):
             answer=None
         )
         
-        print(f"[INSTANT] Returning intro question immediately!")
-        print(f"[BACKGROUND] Starting resume parsing and Q1 generation in background...")
+        logger.debug("[INSTANT] Returning intro question; resume parsing and Q1 generation continue in background")
         
         # ===== BACKGROUND: Parse resume + Generate Q1 =====
         # This runs while user answers the intro question
@@ -1037,9 +1647,7 @@ async def init_interview(request: InitInterviewRequest):
         return InitInterviewResponse(question=intro_question)
         
     except Exception as e:
-        import traceback
-        print(f"[ERROR] Exception occurred while initializing interview:")
-        print(traceback.format_exc())
+        logger.exception("Exception occurred while initializing interview")
         raise HTTPException(status_code=500, detail=f"Error initializing interview: {str(e)}")
 
 
@@ -1049,31 +1657,22 @@ async def generate_first_question_background(session_id: str, resume_text: str,
     Runs while user answers the introductory question.
     """
     try:
-        import time
         start_time = time.time()
-        print(f"[BACKGROUND] Starting resume parsing for session {session_id}")
+        logger.info("[BACKGROUND] Starting resume parsing for session %s", session_id)
         
-        # Parse resume (takes ~1-2 seconds)
-        resume_profile = parse_resume_from_chunks(resume_text, chunks)
+        # Parse resume (takes ~1-2 seconds) while the resume chunks are ranked; the
+        # ranking only needs the chunks and is cached on the session for Q1
+        resume_profile, _ = await asyncio.gather(
+            parse_resume_from_chunks(resume_text, chunks),
+            get_session_resume_context(session_id, chunks)
+        )
         
         elapsed = time.time() - start_time
-        print(f"[BACKGROUND] Resume parsed in {elapsed:.2f}s")
-        
-        # Determine max questions based on seniority
-        seniority = resume_profile.get('seniority_level', 'Junior').lower()
-        if seniority == "fresher":
-            max_questions = 5
-        elif seniority == "junior":
-            max_questions = 7
-        else:
-            max_questions = 10
+        logger.info("[BACKGROUND] Resume parsed in %.2fs", elapsed)
         
-        # Update session with actual profile
-        session = session_manager.get_session(session_id)
-        if session:
-            session["resume_profile"] = resume_profile
-            session["max_questions"] = max_questions
-            print(f"[BACKGROUND] Session updated with profile: {resume_profile.get('seniority_level')}")
+        # Update session with actual profile (max questions follow the seniority)
+        max_questions = session_manager.set_resume_profile(session_id, resume_profile)
+        logger.debug("[BACKGROUND] Session updated with profile: %s", resume_profile.get('seniority_level'))
         
         # Store candidate profile in Memori
         skills_str = ', '.join(resume_profile.get('skills', [])[:10])  # Limit to 10 skills for memory
@@ -1085,11 +1684,12 @@ Candidate Profile for Interview:
 - Key Skills: {skills_str}
 - Experience Summary: {resume_profile.get('experience', 'No experience available')[:500]}
 """
-        store_memory_via_llm(entity_id=session_id, memory_text=memory_text)
+        # Profile memory goes through the background queue - Q1 doesn't recall it
+        await store_memory_via_llm(entity_id=session_id, memory_text=memory_text)
         
-        # Generate first real question (takes ~1-2 seconds)
-        print(f"[BACKGROUND] Generating first real question...")
-        first_question = generate_first_question(
+        # Generate first real question (~1-2 seconds)
+        logger.debug("[BACKGROUND] Generating first real question...")
+        first_question = await generate_first_question(
             session_id=session_id,
             chunks=chunks,
             seniority_level=resume_profile['seniority_level'],
@@ -1101,196 +1701,191 @@ Candidate Profile for Interview:
         session_manager.set_pregenerated_question(session_id, first_question)
         
         total_elapsed = time.time() - start_time
-        print(f"[BACKGROUND] First question pre-generated in {total_elapsed:.2f}s total")
-        print(f"[BACKGROUND] Q1: {first_question[:100]}...")
+        logger.info("[BACKGROUND] First question pre-generated in %.2fs total", total_elapsed)
+        logger.debug("[BACKGROUND] Q1: %.100s...", first_question)
         
     except Exception as e:
-        print(f"[BACKGROUND ERROR] Failed to generate first question: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("[BACKGROUND] Failed to generate first question: %s", e)
+
+
+REPEAT_PREFIXES = [
+    "Sure, I will repeat the question: ",
+    "Sure, here is the question again: ",
+    "No problem, my question was: ",
+]
+
+MAX_CONSECUTIVE_CLARIFY = 2
+
+
+def build_closing_message(resume_profile: Optional[Dict[str, Any]]) -> str:
+    """Farewell message once the interview has reached its question quota."""
+    candidate_name = resume_profile.get('candidate_first_name', '') if resume_profile else ''
+    if candidate_name and candidate_name.lower() != 'unknown':
+        return f"Thank you so much, {candidate_name}! That concludes our interview. You did a great job, and I really enjoyed our conversation. We'll be in touch soon with your results. Best of luck!"
+    return "Thank you so much! That concludes our interview. You did a great job, and I really enjoyed our conversation. We'll be in touch soon with your results. Best of luck!"
+
+
+@dataclass
+class NextQuestionContext:
+    """Session state both next-question endpoints need after the answer is recorded."""
+    repeat_question: Optional[str] = None  # Set when the candidate asked to hear the question again
+    closing_message: Optional[str] = None  # Set when the question quota is already reached
+    questions_asked: int = 0
+    max_questions: int = 0
+    resume_profile: Dict[str, Any] = field(default_factory=dict)
+    chunks: List[str] = field(default_factory=list)
+    conversation: List[TurnEntry] = field(default_factory=list)  # Live list, read-only
+
+
+async def _prepare_next_question_context(session_id: str, current_answer: str) -> NextQuestionContext:
+    """
+    Shared first half of /next-question and /next-question-stream: handle a repeat
+    request, record the answer, and gather everything needed to produce the next question.
+    
+    Raises:
+        HTTPException: 404 if the session does not exist
+    """
+    session = session_manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    # If the user asked to repeat the current question, do NOT store this as the answer
+    # (do not increment question count). Checked before any Memori/LLM work so a repeat
+    # costs only a regex match.
+    if is_repeat_request(current_answer):
+        repeat_q = session_manager.get_last_question(session_id)
+        if repeat_q is not None:
+            logger.info("[REPEAT] User requested repeat. Re-sending last question for session %s", session_id)
+            return NextQuestionContext(repeat_question=repeat_q)
+    
+    # Live (non-copied) list, fetched once: later appends by the session manager show up here
+    conversation = session_manager.get_conversation_history_ref(session_id)
+    
+    # Record the candidate's answer for the last question if missing
+    if conversation and conversation[-1].answer is None:
+        last_question = conversation[-1].question or "Unknown question"
+        # update_answer_only checks the is_clarifying flag before counting the answer
+        session_manager.update_answer_only(session_id=session_id, answer=current_answer)
+        
+        # Store Q&A exchange in Memori - enqueued for the background memory workers
+        memory_text = f"""
+Interview Q&A Exchange:
+Question: {last_question[:500]}
+Candidate's Answer: {current_answer[:1000]}
+"""
+        await store_memory_via_llm(entity_id=session_id, memory_text=memory_text)
+        schedule_history_summary(session_id)
+    
+    ctx = NextQuestionContext(
+        questions_asked=session_manager.get_questions_asked(session_id),
+        max_questions=session_manager.get_max_questions(session_id),
+        resume_profile=session_manager.get_resume_profile(session_id) or {},
+        chunks=session_manager.get_chunks(session_id),
+        conversation=conversation
+    )
+    if ctx.questions_asked >= ctx.max_questions:
+        logger.debug("Interview completed - max questions reached")
+        ctx.closing_message = build_closing_message(ctx.resume_profile)
+    return ctx
+
+
+def record_next_question(session_id: str, next_q: str, conversation: List[TurnEntry]) -> str:
+    """
+    Store a freshly generated question in the session and return it without its tag.
+    Clarifying follow-ups don't count toward the quota, capped at MAX_CONSECUTIVE_CLARIFY
+    in a row to prevent an infinite loop.
+    """
+    is_clarify = is_clarifying_question(next_q)
+    
+    # Count consecutive clarifying questions
+    consecutive_clarify = 0
+    for qa in reversed(conversation):
+        if qa.is_clarifying:
+            consecutive_clarify += 1
+        else:
+            break
+    
+    # Force regular question after 2 consecutive clarifying questions
+    if is_clarify and consecutive_clarify >= MAX_CONSECUTIVE_CLARIFY:
+        logger.info("[CLARIFY] Hit max consecutive clarify limit (%d). Treating as regular question.", MAX_CONSECUTIVE_CLARIFY)
+        is_clarify = False
+    
+    # Strip the [CLARIFY] tag before storing/returning (also if we forced it to be regular)
+    next_q = strip_clarify_tag(next_q)
+    if is_clarify:
+        logger.info("[CLARIFY] Detected clarifying question (%d/%d) - will NOT count toward quota",
+                    consecutive_clarify + 1, MAX_CONSECUTIVE_CLARIFY)
+        # Store clarifying question WITHOUT incrementing counter
+        session_manager.add_clarifying_question(session_id=session_id, question=next_q)
+    else:
+        # Regular question - store normally (will increment counter when answered)
+        session_manager.update_conversation(session_id=session_id, question=next_q, answer=None)
+    return next_q
 
 
 @app.post("/next-question", response_model=NextQuestionResponse)
-async def next_question(request: NextQuestionRequest):
+async def next_question(request: NextQuestionRequest, background_tasks: BackgroundTasks):
     """
     Generate the next interview question based on the candidate's answer.
     Uses pre-generated questions for instant response when available.
     """
-    import asyncio
-    import time
-    
     try:
         start_time = time.time()
-        print(f"[DEBUG] Generating next question for session: {request.sessionId}")
-
-        if memori:
-            memori.attribution(
-                entity_id=request.sessionId,
-                process_id="mock-interviewer"
-            )
+        logger.debug("Generating next question for session: %s", request.sessionId)
         
-        # Get session data
-        session = session_manager.get_session(request.sessionId)
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
-        
-        # Update conversation with the answer to current question
-        # Use update_answer_only which correctly handles clarifying questions
-        conversation = session_manager.get_conversation_history(request.sessionId)
-        # If the user asked to repeat the current question, do NOT store this as the answer
-        # and simply return the current question unchanged (do not increment question count).
-        if conversation and len(conversation) > 0 and is_repeat_request(request.currentAnswer):
-            last_qa = conversation[-1]
-            repeat_q = last_qa.get("question") or ""
-            prefix = ["Sure, I will repeat the question: ", "Sure, here is the question again: ", "No problem, my question was: "]
-            print(f"[REPEAT] User requested repeat. Re-sending last question for session {request.sessionId}")
-            return NextQuestionResponse(nextQuestion=f"{random.choice(prefix)}{repeat_q}", isRepeat=True)
-        
-        # Normal flow: record the candidate's answer for the last question if missing
-        if conversation and len(conversation) > 0:
-            last_qa = conversation[-1]
-            if last_qa.get("answer") is None:
-                # Use update_answer_only which checks is_clarifying flag
-                session_manager.update_answer_only(
-                    session_id=request.sessionId,
-                    answer=request.currentAnswer
-                )
-                
-                # Store Q&A exchange in Memori
-                last_question = last_qa.get("question", "Unknown question")
-                memory_text = f"""
-Interview Q&A Exchange:
-Question: {last_question[:500]}
-Candidate's Answer: {request.currentAnswer[:1000]}
-"""
-                store_memory_via_llm(entity_id=request.sessionId, memory_text=memory_text)
+        ctx = await _prepare_next_question_context(request.sessionId, request.currentAnswer)
+        if ctx.repeat_question is not None:
+            return NextQuestionResponse(nextQuestion=f"{random.choice(REPEAT_PREFIXES)}{ctx.repeat_question}", isRepeat=True)
+        if ctx.closing_message:
+            return NextQuestionResponse(nextQuestion=None, isComplete=True, closingMessage=ctx.closing_message)
         
         # Check for pre-generated question (instant response!)
-        pregenerated = session_manager.get_pregenerated_question(request.sessionId)
+        next_q = session_manager.get_pregenerated_question(request.sessionId)
         
-        if pregenerated:
-            # Use pre-generated question - nearly instant!
-            next_q = pregenerated
+        if next_q:
             elapsed = time.time() - start_time
-            print(f"[PREGEN] Used pre-generated question in {elapsed:.3f}s (instant!)")
+            logger.info("[PREGEN] Used pre-generated question in %.3fs", elapsed)
         else:
             # No pre-generated question, generate normally
-            questions_asked = session_manager.get_questions_asked(request.sessionId)
-            max_questions = session_manager.get_max_questions(request.sessionId)
-            resume_profile = session_manager.get_resume_profile(request.sessionId)
-            chunks = session_manager.get_chunks(request.sessionId)
-            
-            if questions_asked >= max_questions:
-                # Get candidate name for personalized closing
-                candidate_name = resume_profile.get('candidate_first_name', '')
-                if candidate_name and candidate_name.lower() != 'unknown':
-                    closing = f"Thank you so much, {candidate_name}! That concludes our interview. You did a great job, and I really enjoyed our conversation. Best of luck!"
-                else:
-                    closing = "Thank you so much! That concludes our interview. You did a great job, and I really enjoyed our conversation.s Best of luck!"
-                
-                return NextQuestionResponse(
-                    nextQuestion=None,
-                    isComplete=True,
-                    closingMessage=closing
-                )
-            
-            conversation = session_manager.get_conversation_history(request.sessionId)
-            chat_history = "\n\n".join([
-                f"{qa['question']}\nA: {qa.get('answer', 'No answer yet')}"
-                for qa in conversation
-            ])
-            
-            next_q = generate_next_question(
+            next_q = await generate_next_question(
                 session_id=request.sessionId,
-                chunks=chunks,
-                seniority_level=resume_profile['seniority_level'],
-                max_questions=max_questions,
-                questions_asked=questions_asked,
-                chat_history=chat_history,
-                candidate_first_name=resume_profile.get('candidate_first_name', 'Candidate')
+                chunks=ctx.chunks,
+                seniority_level=ctx.resume_profile['seniority_level'],
+                max_questions=ctx.max_questions,
+                questions_asked=ctx.questions_asked,
+                candidate_first_name=ctx.resume_profile.get('candidate_first_name', 'Candidate')
             )
             elapsed = time.time() - start_time
-            print(f"[DEBUG] Generated question normally in {elapsed:.2f}s")
+            logger.debug("Generated question normally in %.2fs", elapsed)
         
-        if next_q:
-            # Check if this is a clarifying question (shouldn't count toward quota)
-            is_clarify = is_clarifying_question(next_q)
-            
-            # Count consecutive clarifying questions to prevent infinite loop
-            conversation = session_manager.get_conversation_history(request.sessionId)
-            consecutive_clarify = 0
-            for qa in reversed(conversation):
-                if qa.get("is_clarifying", False):
-                    consecutive_clarify += 1
-                else:
-                    break
-            
-            # Force regular question after 2 consecutive clarifying questions
-            MAX_CONSECUTIVE_CLARIFY = 2
-            if is_clarify and consecutive_clarify >= MAX_CONSECUTIVE_CLARIFY:
-                print(f"[CLARIFY] Hit max consecutive clarify limit ({MAX_CONSECUTIVE_CLARIFY}). Treating as regular question.")
-                is_clarify = False
-            
-            if is_clarify:
-                # Strip the [CLARIFY] tag before storing/returning
-                next_q = strip_clarify_tag(next_q)
-                print(f"[CLARIFY] Detected clarifying question ({consecutive_clarify + 1}/{MAX_CONSECUTIVE_CLARIFY}) - will NOT count toward quota")
-                
-                # Store clarifying question WITHOUT incrementing counter
-                # We store it directly in session without using update_conversation's increment
-                session_manager.add_clarifying_question(
-                    session_id=request.sessionId,
-                    question=next_q
-                )
-            else:
-                # Regular question - store normally (will increment counter when answered)
-                # Strip [CLARIFY] tag if present (in case we forced it to be regular)
-                next_q = strip_clarify_tag(next_q)
-                session_manager.update_conversation(
-                    session_id=request.sessionId,
-                    question=next_q,
-                    answer=None
-                )
-            
-            # Trigger background pre-generation for NEXT-NEXT question
-            asyncio.create_task(
-                pregenerate_next_question_background(request.sessionId)
-            )
-        else:
+        if not next_q:
             # Interview is complete - provide closing message
-            print(f"[DEBUG] Interview completed - max questions reached")
-            resume_profile = session_manager.get_resume_profile(request.sessionId)
-            candidate_name = resume_profile.get('candidate_first_name', '') if resume_profile else ''
-            if candidate_name and candidate_name.lower() != 'unknown':
-                closing = f"Thank you so much, {candidate_name}! That concludes our interview. You did a great job, and I really enjoyed our conversation. We'll be in touch soon with your results. Best of luck!"
-            else:
-                closing = "Thank you so much! That concludes our interview. You did a great job, and I really enjoyed our conversation. We'll be in touch soon with your results. Best of luck!"
-            
             return NextQuestionResponse(
                 nextQuestion=None,
                 isComplete=True,
-                closingMessage=closing
+                closingMessage=build_closing_message(ctx.resume_profile)
             )
         
+        next_q = record_next_question(request.sessionId, next_q, ctx.conversation)
+        
+        # Pre-generate the NEXT-NEXT question once the response has been sent,
+        # overlapping the LLM call with TTS playback and the candidate's answer
+        background_tasks.add_task(pregenerate_next_question_background, request.sessionId)
+        
         return NextQuestionResponse(nextQuestion=next_q, isComplete=False)
         
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        print(f"[ERROR] Exception occurred while generating next question:")
-        print(traceback.format_exc())
+        logger.exception("Exception occurred while generating next question")
         raise HTTPException(status_code=500, detail=f"Error generating next question: {str(e)}")
 
 
 async def pregenerate_next_question_background(session_id: str):
     """Background task to pre-generate the next question while user is answering."""
     try:
-        import asyncio
-        # Small delay to let current response complete
-        await asyncio.sleep(0.5)
-        
-        session = session_manager.get_session(session_id)
+        # Background work isn't client activity - don't extend the session's idle timeout
+        session = session_manager.get_session(session_id, touch=False)
         if not session:
             return
         
@@ -1299,135 +1894,88 @@ async def pregenerate_next_question_background(session_id: str):
         
         # Don't pre-generate if interview is about to end
         if questions_asked >= max_questions - 1:
-            print(f"[PREGEN] Skipping pre-generation - interview near end")
+            logger.debug("[PREGEN] Skipping pre-generation - interview near end")
             return
         
         resume_profile = session_manager.get_resume_profile(session_id)
         chunks = session_manager.get_chunks(session_id)
-        conversation = session_manager.get_conversation_history(session_id)
         
-        chat_history = "\n\n".join([
-            f"{qa['question']}\nA: {qa.get('answer', 'No answer yet')}"
-            for qa in conversation
-        ])
+        logger.debug("[PREGEN] Starting background pre-generation for session %s", session_id)
         
-        print(f"[PREGEN] Starting background pre-generation for session {session_id}")
-        
-        pregenerated_question = generate_next_question(
+        pregenerated_question = await generate_next_question(
             session_id=session_id,
             chunks=chunks,
             seniority_level=resume_profile['seniority_level'],
             max_questions=max_questions,
             questions_asked=questions_asked + 1,  # For the NEXT question
-            chat_history=chat_history,
             candidate_first_name=resume_profile.get('candidate_first_name', 'Candidate')
         )
         
         if pregenerated_question:
             session_manager.set_pregenerated_question(session_id, pregenerated_question)
-            print(f"[PREGEN] Background pre-generation complete for session {session_id}")
+            logger.info("[PREGEN] Background pre-generation complete for session %s", session_id)
     
     except Exception as e:
-        print(f"[PREGEN ERROR] Background pre-generation failed: {str(e)}")
+        logger.warning("[PREGEN] Background pre-generation failed: %s", e)
 
 
 # ==================== Streaming Endpoint ====================
 
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+}
+
+
 @app.post("/next-question-stream")
 async def next_question_stream(request: NextQuestionRequest):
     """
     Stream the next interview question word-by-word for faster perceived response.
     Uses Server-Sent Events (SSE) format.
     """
-    import time
+    ctx = await _prepare_next_question_context(request.sessionId, request.currentAnswer)
     
-    session = session_manager.get_session(request.sessionId)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    # Update conversation with answer
-    conversation = session_manager.get_conversation_history(request.sessionId)
-    # If user asked to repeat, stream the last question again and do not record an answer
-    if conversation and len(conversation) > 0 and is_repeat_request(request.currentAnswer):
-        last_qa = conversation[-1]
-        repeat_q = last_qa.get("question", "") or ""
-        # Stream the repeat as small chunks for SSE clients, with a spoken prefix
-        prefix = ["Sure, I will repeat the question: ", "Certainlly, here is the question again: ", "Sure thing, here is the question again: "]
-        full_text = f"{random.choice(prefix)}{repeat_q}"
-        def repeat_generator():
-            # Yield small chunks for better streaming behavior
-            q = full_text
+    if ctx.repeat_question is not None or ctx.closing_message:
+        # Repeat or closing message: stream the fixed text as small chunks for SSE clients
+        if ctx.repeat_question is not None:
+            full_text = f"{random.choice(REPEAT_PREFIXES)}{ctx.repeat_question}"
+            done = {"done": True, "fullQuestion": full_text, "isRepeat": True}
+        else:
+            full_text = ctx.closing_message
+            done = {"done": True, "fullQuestion": None, "isComplete": True, "closingMessage": full_text}
+        
+        async def fixed_text_generator():
             chunk_size = 50
-            for i in range(0, len(q), chunk_size):
-                chunk = q[i:i+chunk_size]
-                yield f"data: {json.dumps({'chunk': chunk})}\n\n"
-
-            yield f"data: {json.dumps({'done': True, 'fullQuestion': full_text.strip(), 'isRepeat': True})}\n\n"
-
-        return StreamingResponse(
-            repeat_generator(),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-            }
-        )
-
-    # Normal flow: record the candidate's answer for the last question if missing
-    if conversation and len(conversation) > 0:
-        last_qa = conversation[-1]
-        if last_qa.get("answer") is None:
-            session_manager.update_conversation(
-                session_id=request.sessionId,
-                question=last_qa["question"],
-                answer=request.currentAnswer
-            )
-    
-    questions_asked = session_manager.get_questions_asked(request.sessionId)
-    max_questions = session_manager.get_max_questions(request.sessionId)
-    resume_profile = session_manager.get_resume_profile(request.sessionId)
-    chunks = session_manager.get_chunks(request.sessionId)
-    
-    conversation = session_manager.get_conversation_history(request.sessionId)
-    chat_history = "\n\n".join([
-        f"{qa['question']}\nA: {qa.get('answer', 'No answer yet')}"
-        for qa in conversation
-    ])
+            for i in range(0, len(full_text), chunk_size):
+                yield sse_frame({"chunk": full_text[i:i + chunk_size]})
+            yield sse_frame(done)
+        
+        return StreamingResponse(fixed_text_generator(), media_type="text/event-stream", headers=SSE_HEADERS)
     
-    def generate():
-        """Generator that streams the question."""
+    async def generate():
+        """Async generator that streams the question (runs on the event loop, not a threadpool)."""
         full_question = ""
         
-        for chunk in stream_next_question(
+        async for chunk in stream_next_question(
             session_id=request.sessionId,
-            chunks=chunks,
-            seniority_level=resume_profile['seniority_level'],
-            max_questions=max_questions,
-            questions_asked=questions_asked,
-            chat_history=chat_history
+            chunks=ctx.chunks,
+            seniority_level=ctx.resume_profile['seniority_level'],
+            max_questions=ctx.max_questions,
+            questions_asked=ctx.questions_asked,
+            candidate_first_name=ctx.resume_profile.get('candidate_first_name', 'Candidate')
         ):
             full_question += chunk
             # SSE format: data: <chunk>\n\n
-            yield f"data: {json.dumps({'chunk': chunk})}\n\n"
-        
-        # Send completion signal with full question
-        yield f"data: {json.dumps({'done': True, 'fullQuestion': full_question.strip()})}\n\n"
+            yield sse_frame({"chunk": chunk})
         
-        # Store in session
-        session_manager.update_conversation(
-            session_id=request.sessionId,
-            question=full_question.strip(),
-            answer=None
-        )
+        # Store in session (same clarify handling as /next-question), then send
+        # the completion signal with the full question
+        full_question = full_question.strip()
+        if full_question:
+            full_question = record_next_question(request.sessionId, full_question, ctx.conversation)
+        yield sse_frame({"done": True, "fullQuestion": full_question})
     
-    return StreamingResponse(
-        generate(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-        }
-    )
+    return StreamingResponse(generate(), media_type="text/event-stream", headers=SSE_HEADERS)
 
 
 # ==================== Health Check ====================
@@ -1441,7 +1989,7 @@ async def generate_assessment_endpoint(request: GenerateAssessmentRequest):
     Returns structured assessment with ratings and recommendations.
     """
     try:
-        print(f"[DEBUG] Generating assessment for session: {request.sessionId}")
+        logger.debug("Generating assessment for session: %s", request.sessionId)
 
         if memori:
             memori.attribution(
@@ -1449,9 +1997,6 @@ async def generate_assessment_endpoint(request: GenerateAssessmentRequest):
                 process_id="mock-interviewer"
             )
         
-        # Create structured LLM for assessment
-        structured_assessor = llm.with_structured_output(InterviewAssessment)
-        
         # Prepare detailed profile document with more context
         profile_doc = {
             "resume_summary": request.resumeText[:2000],  # Include more resume context
@@ -1460,13 +2005,12 @@ async def generate_assessment_endpoint(request: GenerateAssessmentRequest):
         }
         
         # Format chat history with clear structure
-        chat_history = "\n\n".join([
-            f"QUESTION {i+1}:\n{qa.get('question', 'N/A')}\n\nCANDIDATE ANSWER {i+1}:\n{qa.get('answer', 'N/A')}" 
-            for i, qa in enumerate(request.transcript)
-        ])
+        chat_history = "\n\n".join(
+            f"QUESTION {i}:\n{qa.get('question', 'N/A')}\n\nCANDIDATE ANSWER {i}:\n{qa.get('answer', 'N/A')}"
+            for i, qa in enumerate(request.transcript, 1)
+        )
         
-        print(f"[DEBUG] Transcript length: {len(chat_history)} characters")
-        print(f"[DEBUG] Number of Q&A pairs: {len(request.transcript)}")
+        logger.debug("Transcript length: %d characters, %d Q&A pairs", len(chat_history), len(request.transcript))
         
         # Prepare inputs for assessment
         inputs = {
@@ -1476,9 +2020,9 @@ async def generate_assessment_endpoint(request: GenerateAssessmentRequest):
         }
         
         # Generate assessment
-        print("[DEBUG] Invoking assessment LLM...")
-        chain = assessment_prompt | structured_assessor
-        assessment = chain.invoke(inputs)
+        logger.debug("Invoking assessment LLM...")
+        chain = get_assessment_chain(InterviewAssessment)
+        assessment = await chain.ainvoke(inputs)
         
         # Convert Pydantic model to dict and map field names to match frontend
         assessment_dict = {
@@ -1491,9 +2035,8 @@ async def generate_assessment_endpoint(request: GenerateAssessmentRequest):
             "answer_quality_analysis": assessment.answer_quality_analysis
         }
         
-        print(f"[DEBUG] Assessment generated successfully")
-        print(f"[DEBUG] Score: {assessment_dict['candidate_score_percent']}/100")
-        print(f"[DEBUG] Recommendation: {assessment_dict['hiring_recommendation']}")
+        logger.info("Assessment generated: score %s/100, recommendation %s",
+                    assessment_dict['candidate_score_percent'], assessment_dict['hiring_recommendation'])
         
         # Store assessment results in Memori
         strengths_str = ', '.join(assessment_dict.get('strengths', [])[:5])
@@ -1506,19 +2049,17 @@ Interview Assessment Results:
 - Areas for Improvement: {weaknesses_str}
 - Assessment Summary: {assessment_dict.get('answer_quality_analysis', 'No summary available')[:500]}
 """
-        store_memory_via_llm(entity_id=request.sessionId, memory_text=memory_text)
+        await store_memory_via_llm(entity_id=request.sessionId, memory_text=memory_text)
         
         # Cleanup session cache after assessment is complete
         session_manager.delete_session(request.sessionId)
-        print(f"[CACHE] Session {request.sessionId} cleaned up from cache")
+        forget_recalls(request.sessionId)
+        logger.debug("[CACHE] Session %s cleaned up from cache", request.sessionId)
         
         return GenerateAssessmentResponse(assessment=assessment_dict)
     
     except Exception as e:
-        print(f"[ERROR] Exception occurred while generating assessment:")
-        print(f"[ERROR] {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Exception occurred while generating assessment")
         raise HTTPException(status_code=500, detail=f"Error generating assessment: {str(e)}")
 
 
@@ -1532,6 +2073,56 @@ class ResumeTipsRequest(BaseModel):
     resume_excerpt: str
 
 
+# Leading list numbering ("1.", "2)", "3 -") stripped from generated tips
+_NUM_PREFIX_RE = re.compile(r'^\d+[\.\)\-\s]+')
+RESUME_TIPS_COUNT = 3
+
+# Minimal, token-efficient tips prompt, filled with str.format per request
+_TIPS_TPL = """Resume Analysis:
+- ATS Score: {score}%
+- Level: {sen}
+- Skills: {sk}
+- Weak Areas: {wk}
+
+Give exactly 3 specific, actionable tips to improve this resume.
+Each tip must be 1 short sentence.
+Focus on the weak areas.
+Format: numbered list only, no intro."""
+
+# Tips per prompt input (score, seniority, top skills, weak areas); repeat callers skip the LLM
+TIPS_LRU_SIZE = 256
+_tips_lru: "OrderedDict[Tuple[int, str, Tuple[str, ...], Tuple[str, ...]], List[str]]" = OrderedDict()
+
+
+async def stream_resume_tips(prompt: str, limit: int = RESUME_TIPS_COUNT) -> List[str]:
+    """
+    Stream the tips completion and clean each line as soon as it is complete.
+    Stops the stream once `limit` tips are in, so the tail of the generation is never waited on.
+    """
+    tips: List[str] = []
+    pending = ""  # Text of the line currently being received
+    stream = llm.astream(prompt)
+    try:
+        async for chunk in stream:
+            pending += chunk.content
+            # Every newline closes a line: clean it and keep it if anything is left
+            *lines, pending = pending.split('\n')
+            for line in lines:
+                cleaned = _NUM_PREFIX_RE.sub('', line.strip()).strip()
+                if cleaned:
+                    tips.append(cleaned)
+                    if len(tips) == limit:
+                        return tips
+    finally:
+        await stream.aclose()
+    
+    # Last tip may arrive without a trailing newline
+    cleaned = _NUM_PREFIX_RE.sub('', pending.strip()).strip()
+    if cleaned:
+        tips.append(cleaned)
+    return tips[:limit]
+
+
 @app.post("/generate-resume-tips")
 async def generate_resume_tips(request: ResumeTipsRequest):
     """
@@ -1539,46 +2130,42 @@ async def generate_resume_tips(request: ResumeTipsRequest):
     Uses minimal tokens (~250 total) for cost efficiency.
     """
     try:
-        # Build a minimal, token-efficient prompt
-        weak_areas_str = ", ".join(request.weak_areas) if request.weak_areas else "none identified"
-        skills_str = ", ".join(request.skills[:5]) if request.skills else "not specified"
+        cache_key = (request.score, request.seniority, tuple(request.skills[:5]), tuple(request.weak_areas))
+        cached = _tips_lru.get(cache_key)
+        if cached is not None:
+            _tips_lru.move_to_end(cache_key)
+            return {
+                "ai_tips": cached,
+                "source": "ai",
+                "tokens_used": "~250",
+                "message": "Personalized tips based on your resume analysis"
+            }
         
-        prompt = f"""Resume Analysis:
-- ATS Score: {request.score}%
-- Level: {request.seniority}
-- Skills: {skills_str}
-- Weak Areas: {weak_areas_str}
-
-Give exactly 3 specific, actionable tips to improve this resume.
-Each tip must be 1 short sentence.
-Focus on the weak areas.
-Format: numbered list only, no intro."""
+        # Build the prompt from the module-level template
+        top_skills, weak_areas = cache_key[2], cache_key[3]
+        prompt = _TIPS_TPL.format(
+            score=request.score,
+            sen=request.seniority,
+            sk=", ".join(top_skills) if top_skills else "not specified",
+            wk=", ".join(weak_areas) if weak_areas else "none identified"
+        )
 
-        # Use a lighter model or lower max_tokens for efficiency
-        response = llm.invoke(prompt)
-        
-        # Parse the response into tips
-        tips_text = response.content.strip()
-        tips = [line.strip() for line in tips_text.split('\n') if line.strip()]
-        
-        # Clean up numbering if present
-        cleaned_tips = []
-        for tip in tips[:3]:
-            # Remove leading numbers like "1.", "1)", etc.
-            import re
-            cleaned = re.sub(r'^[\d]+[\.\)\-\s]+', '', tip).strip()
-            if cleaned:
-                cleaned_tips.append(cleaned)
+        # Stream and parse line by line, returning as soon as the third tip completes
+        cleaned_tips = await stream_resume_tips(prompt)
+        if cleaned_tips:
+            _tips_lru[cache_key] = cleaned_tips
+            if len(_tips_lru) > TIPS_LRU_SIZE:
+                _tips_lru.popitem(last=False)
         
         return {
-            "ai_tips": cleaned_tips[:3],
+            "ai_tips": cleaned_tips,
             "source": "ai",
             "tokens_used": "~250",
             "message": "Personalized tips based on your resume analysis"
         }
         
     except Exception as e:
-        print(f"[ERROR] Failed to generate AI tips: {str(e)}")
+        logger.exception("Failed to generate AI tips")
         raise HTTPException(status_code=500, detail=f"Failed to generate tips: {str(e)}")
 
 
@@ -1596,4 +2183,5 @@ async def health_check():
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 5000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # "auto" picks uvloop + httptools when installed (uvicorn[standard]) and falls back to asyncio/h11
+    uvicorn.run(app, host="0.0.0.0", port=port, loop="auto", http="auto")
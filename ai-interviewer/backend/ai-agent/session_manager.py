@@ -3,18 +3,101 @@ Session Manager for Interview State
 Manages in-memory session state without using vectorstore
 """
 
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import asyncio
+import heapq
+import logging
+import re
 import threading
+import time
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class TurnEntry:
+    """
+    One question (and its answer, once given) in a session's conversation history.
+    Slotted: no per-entry dict, roughly a quarter of the memory of the dict it replaces.
+    """
+    question: str
+    answer: Optional[str]
+    timestamp: str
+    is_clarifying: bool = False  # Clarifying follow-ups don't count toward the quota
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain-dict form handed out by get_conversation_history."""
+        return {
+            "question": self.question,
+            "answer": self.answer,
+            "timestamp": self.timestamp,
+            "is_clarifying": self.is_clarifying
+        }
+
+
+# Interview length by seniority; Mid-Senior, Senior and Lead get the default
+_SENIORITY_TO_MAX = {"fresher": 5, "junior": 7}
+_DEFAULT_MAX_QUESTIONS = 10
+# conversation_history is capped at this many entries per allowed question (clarifying
+# follow-ups included); only a misbehaving client ever reaches it
+HISTORY_CAP_FACTOR = 3
+
+
+# (unix second, ISO string) of the last timestamp handed out; swapped as one tuple
+_ts_cache: Tuple[int, str] = (0, "")
+
+
+def _iso_now() -> str:
+    """UTC ISO timestamp at second resolution, formatted at most once per second."""
+    global _ts_cache
+    now = int(time.time())
+    cached_at, cached = _ts_cache
+    if now != cached_at:
+        cached = datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None).isoformat()
+        _ts_cache = (now, cached)
+    return cached
+
+
+# Common words ignored when extracting question topics
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been',
+    'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
+    'would', 'could', 'should', 'may', 'might', 'must', 'shall',
+    'can', 'about', 'your', 'you', 'me', 'tell', 'what', 'how',
+    'why', 'when', 'where', 'which', 'who', 'with', 'and', 'or',
+    'to', 'of', 'in', 'for', 'on', 'at', 'by', 'from', 'that',
+    'this', 'it', 'its', 'more', 'some', 'any', 'most'
+})
+
+# Candidate topic words: runs of 3+ letters, so punctuation and short words drop out in one scan
+_TOPIC_RE = re.compile(r"[a-z]{3,}")
 
 class SessionManager:
-    """Manages interview session state in-memory."""
+    """
+    Manages interview session state in-memory.
+    
+    Locking: self._lock only guards membership of the sessions dict (create, delete,
+    cleanup). Lookups and single-key writes (resume context, errors, pre-generated
+    questions) are plain dict operations, atomic under the GIL, and take no lock.
+    Only read-modify-write updates of a session's state take that session's own
+    lock, so unrelated interviews never wait on each other.
+    """
     
     def __init__(self, session_timeout_minutes: int = 60):
         self._sessions: Dict[str, Dict[str, Any]] = {}
         self._lock = threading.Lock()
-        self.session_timeout = timedelta(minutes=session_timeout_minutes)
+        # Pre-generated question slot per session. Single-key dict assignment and
+        # pop() are atomic under the GIL, so this hot path takes no lock at all
+        self._pregen: Dict[str, str] = {}
+        # Seconds, compared against time.monotonic() in last_accessed
+        self.session_timeout = session_timeout_minutes * 60
+        # Min-heap of (expiry deadline, session_id). Touches don't push: a popped entry
+        # whose session was used since is re-pushed with its real deadline instead
+        self._expiry_heap: List[Tuple[float, str]] = []
     
     def create_session(
         self, 
@@ -23,24 +106,40 @@ class SessionManager:
         chunks: List[str]
     ) -> None:
         """Create a new interview session."""
+        max_questions = self._determine_max_questions(resume_profile)
         with self._lock:
+            heapq.heappush(self._expiry_heap, (time.monotonic() + self.session_timeout, session_id))
             self._sessions[session_id] = {
                 "resume_profile": resume_profile,
                 "chunks": chunks,
                 "conversation_history": [],
                 "questions_asked": 0,
-                "max_questions": self._determine_max_questions(resume_profile),
+                "max_questions": max_questions,
+                "history_cap": max_questions * HISTORY_CAP_FACTOR,  # Bound on conversation_history
+                "resume_context": None,  # Cached prompt-ready resume excerpt
+                "history_text": "",  # Incrementally built Q&A transcript
+                "history_turns": 0,
+                "history_summary": "",  # Rolling LLM summary of older turns
+                "summary_covers_up_to": 0,  # conversation_history[:n] is folded into the summary
+                "last_open_idx": None,  # Index of the question awaiting an answer, if any
                 "created_at": datetime.utcnow(),
-                "last_accessed": datetime.utcnow()
+                "last_accessed": time.monotonic(),
+                "lock": threading.Lock()  # Guards mutations of this session only
             }
     
-    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """Get session data."""
-        with self._lock:
-            session = self._sessions.get(session_id)
-            if session:
-                session["last_accessed"] = datetime.utcnow()
-            return session
+    def get_session(self, session_id: str, touch: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Get session data. With touch=True (the request entry points) this also marks the
+        session as used; the float store is atomic under the GIL, so no lock is taken.
+        """
+        session = self._sessions.get(session_id)
+        if session and touch:
+            session["last_accessed"] = time.monotonic()
+        return session
+    
+    def _peek_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get session data without side effects - used by all the read-only getters."""
+        return self._sessions.get(session_id)
     
     def update_conversation(
         self, 
@@ -49,17 +148,19 @@ class SessionManager:
         answer: Optional[str] = None
     ) -> None:
         """Add Q&A to conversation history."""
-        with self._lock:
-            if session_id in self._sessions:
-                self._sessions[session_id]["conversation_history"].append({
-                    "question": question,
-                    "answer": answer,
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "is_clarifying": False  # Regular question
-                })
-                if answer:  # Only increment when answer is provided
-                    self._sessions[session_id]["questions_asked"] += 1
-                self._sessions[session_id]["last_accessed"] = datetime.utcnow()
+        session = self._sessions.get(session_id)
+        if not session:
+            return
+        with session["lock"]:
+            if self._history_full(session_id, session):
+                return
+            session["conversation_history"].append(self._new_entry(question, answer, is_clarifying=False))
+            if answer is None:
+                session["last_open_idx"] = len(session["conversation_history"]) - 1
+            if answer:  # Only increment when answer is provided
+                session["questions_asked"] += 1
+                self._append_history_text(session, question, answer)
+            session["last_accessed"] = time.monotonic()
     
     def add_clarifying_question(
         self, 
@@ -70,16 +171,17 @@ class SessionManager:
         Add a clarifying question to conversation history WITHOUT incrementing the counter.
         Used for follow-up questions when candidate gives vague/skip answers.
         """
-        with self._lock:
-            if session_id in self._sessions:
-                self._sessions[session_id]["conversation_history"].append({
-                    "question": question,
-                    "answer": None,
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "is_clarifying": True  # Clarifying question - doesn't count
-                })
-                self._sessions[session_id]["last_accessed"] = datetime.utcnow()
-                print(f"[CLARIFY] Added clarifying question for session {session_id} (NOT counted)")
+        session = self._sessions.get(session_id)
+        if not session:
+            return
+        with session["lock"]:
+            if self._history_full(session_id, session):
+                return
+            # Clarifying question - doesn't count
+            session["conversation_history"].append(self._new_entry(question, None, is_clarifying=True))
+            session["last_open_idx"] = len(session["conversation_history"]) - 1
+            session["last_accessed"] = time.monotonic()
+        logger.debug("[CLARIFY] Added clarifying question for session %s (NOT counted)", session_id)
     
     def update_answer_only(
         self, 
@@ -94,163 +196,278 @@ class SessionManager:
             session_id: The session identifier
             answer: The candidate's answer
         """
-        with self._lock:
-            if session_id in self._sessions:
-                history = self._sessions[session_id]["conversation_history"]
-                # Find the last question without an answer
-                for i in range(len(history) - 1, -1, -1):
-                    if history[i].get("answer") is None:
-                        history[i]["answer"] = answer
-                        was_clarifying = history[i].get("is_clarifying", False)
-                        if was_clarifying:
-                            print(f"[CLARIFY] Updated answer for clarifying question (NOT counted)")
-                        else:
-                            # If it wasn't a clarifying question, increment the counter
-                            self._sessions[session_id]["questions_asked"] += 1
-                        break
-                self._sessions[session_id]["last_accessed"] = datetime.utcnow()
-    
-    def get_conversation_history(self, session_id: str) -> List[Dict[str, str]]:
-        """Get full conversation history for a session."""
-        session = self.get_session(session_id)
+        session = self._sessions.get(session_id)
+        if not session:
+            return
+        with session["lock"]:
+            session["last_accessed"] = time.monotonic()
+            # The last question without an answer is tracked, so no scan is needed
+            idx = session["last_open_idx"]
+            if idx is None:
+                return
+            entry = session["conversation_history"][idx]
+            entry.answer = answer
+            session["last_open_idx"] = None
+            self._append_history_text(session, entry.question, answer)
+            if entry.is_clarifying:
+                logger.debug("[CLARIFY] Updated answer for clarifying question (NOT counted)")
+            else:
+                # If it wasn't a clarifying question, increment the counter
+                session["questions_asked"] += 1
+    
+    @staticmethod
+    def _history_full(session_id: str, session: Dict[str, Any]) -> bool:
+        """
+        True (and the new turn is dropped) once the history cap is hit (caller holds the session lock).
+        The quota is marked as used up so the next request ends the interview with the closing message.
+        """
+        if len(session["conversation_history"]) < session["history_cap"]:
+            return False
+        logger.warning("[SESSION] History cap reached for session %s, ending interview", session_id)
+        session["questions_asked"] = max(session["questions_asked"], session["max_questions"])
+        session["last_open_idx"] = None
+        return True
+    
+    @staticmethod
+    def _new_entry(question: str, answer: Optional[str], is_clarifying: bool) -> TurnEntry:
+        """Build one conversation_history entry."""
+        return TurnEntry(question, answer, _iso_now(), is_clarifying)
+    
+    def _append_history_text(self, session: Dict[str, Any], question: str, answer: str) -> None:
+        """Append one answered Q&A to the cached transcript (caller holds the session lock)."""
+        session["history_turns"] += 1
+        n = session["history_turns"]
+        session["history_text"] += f"Q{n}: {question}\nA{n}: {answer}\n\n"
+    
+    def get_history_summary(self, session_id: str) -> Tuple[str, int]:
+        """Get (rolling summary, number of leading turns it covers)."""
+        session = self._peek_session(session_id)
+        if not session:
+            return "", 0
+        return session["history_summary"], session["summary_covers_up_to"]
+    
+    def set_history_summary(self, session_id: str, summary: str, covers_up_to: int) -> None:
+        """Store an updated rolling summary; never moves the covered index backwards."""
+        session = self._sessions.get(session_id)
+        if not session:
+            return
+        with session["lock"]:
+            if covers_up_to > session["summary_covers_up_to"]:
+                session["history_summary"] = summary
+                session["summary_covers_up_to"] = covers_up_to
+    
+    def get_history_text(self, session_id: str) -> str:
+        """Get the incrementally built transcript of answered questions."""
+        session = self._peek_session(session_id)
+        return session["history_text"] if session else ""
+    
+    def get_resume_context(self, session_id: str) -> Optional[str]:
+        """Get the cached prompt-ready resume context (None if not computed yet)."""
+        session = self._peek_session(session_id)
+        return session.get("resume_context") if session else None
+    
+    def set_resume_context(self, session_id: str, resume_context: str) -> None:
+        """Cache the prompt-ready resume context for a session."""
+        session = self._sessions.get(session_id)
+        if session:
+            session["resume_context"] = resume_context
+    
+    def get_conversation_history(self, session_id: str) -> List[Dict[str, Any]]:
+        """Get a snapshot of the full conversation history for a session, as plain dicts."""
+        session = self._peek_session(session_id)
+        if not session:
+            return []
+        with session["lock"]:
+            return [entry.to_dict() for entry in session["conversation_history"]]
+    
+    def get_conversation_history_ref(self, session_id: str) -> List[TurnEntry]:
+        """
+        Get the live list of TurnEntry objects without copying.
+        Callers must treat it as read-only; mutate through the update_* methods.
+        """
+        session = self._peek_session(session_id)
         return session["conversation_history"] if session else []
     
+    def get_last_question(self, session_id: str) -> Optional[str]:
+        """Get the most recently asked question (None if nothing asked yet)."""
+        session = self._peek_session(session_id)
+        if not session or not session["conversation_history"]:
+            return None
+        return session["conversation_history"][-1].question or ""
+    
     def get_questions_asked(self, session_id: str) -> int:
         """Get number of questions asked in session."""
-        session = self.get_session(session_id)
+        session = self._peek_session(session_id)
         return session["questions_asked"] if session else 0
     
     def get_max_questions(self, session_id: str) -> int:
         """Get max questions for session."""
-        session = self.get_session(session_id)
+        session = self._peek_session(session_id)
         return session["max_questions"] if session else 0
     
     def delete_session(self, session_id: str) -> None:
         """Delete a session."""
         with self._lock:
-            if session_id in self._sessions:
-                del self._sessions[session_id]
+            self._sessions.pop(session_id, None)
+            self._pregen.pop(session_id, None)
     
     def cleanup_expired_sessions(self) -> int:
-        """Remove sessions that haven't been accessed recently."""
+        """
+        Remove sessions that haven't been accessed recently.
+        Only heap entries that are due are inspected - O(k log N) for k due entries.
+        """
+        expired: List[str] = []
         with self._lock:
-            now = datetime.utcnow()
-            expired = [
-                sid for sid, session in self._sessions.items()
-                if now - session["last_accessed"] > self.session_timeout
-            ]
+            now = time.monotonic()
+            heap = self._expiry_heap
+            while heap and heap[0][0] <= now:
+                _, sid = heapq.heappop(heap)
+                session = self._sessions.get(sid)
+                if session is None:
+                    continue  # Already deleted - stale entry
+                deadline = session["last_accessed"] + self.session_timeout
+                if deadline > now:
+                    # Used since this entry was pushed - reschedule at its real deadline
+                    heapq.heappush(heap, (deadline, sid))
+                    continue
+                expired.append(sid)
+            
+            if len(expired) > len(self._sessions) // 4:
+                # Mass expiry (e.g. after an idle night): one rebuild beats many deletes,
+                # and the fresh dict drops the slack a shrinking dict never gives back
+                gone = set(expired)
+                self._sessions = {sid: s for sid, s in self._sessions.items() if sid not in gone}
+            else:
+                for sid in expired:
+                    del self._sessions[sid]
             for sid in expired:
-                del self._sessions[sid]
-            return len(expired)
+                self._pregen.pop(sid, None)
+        removed = len(expired)
+        if removed:
+            logger.info("[SESSION] Expired %d idle sessions", removed)
+        return removed
+    
+    async def run_expiry_sweeper(self, interval_seconds: float = 30.0) -> None:
+        """Periodically expire idle sessions, off the request path. Runs until cancelled."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            self.cleanup_expired_sessions()
     
     def _determine_max_questions(self, resume_profile: Dict[str, Any]) -> int:
         """Determine max questions based on seniority level."""
         seniority = resume_profile.get("seniority_level", "Junior").lower()
-        
-        if seniority == "fresher":
-            return 5
-        elif seniority == "junior":
-            return 7
-        else:  # Mid-Senior, Senior, Lead
-            return 10
+        return _SENIORITY_TO_MAX.get(seniority, _DEFAULT_MAX_QUESTIONS)
     
     def get_chunks(self, session_id: str) -> List[str]:
         """Get resume chunks for a session."""
-        session = self.get_session(session_id)
+        session = self._peek_session(session_id)
         return session["chunks"] if session else []
     
     def get_resume_profile(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get resume profile for a session."""
-        session = self.get_session(session_id)
+        session = self._peek_session(session_id)
         return session["resume_profile"] if session else None
     
+    def set_resume_profile(self, session_id: str, resume_profile: Dict[str, Any]) -> int:
+        """
+        Replace the placeholder profile with the parsed one and re-derive max questions.
+        
+        Returns:
+            The max questions for the new profile
+        """
+        max_questions = self._determine_max_questions(resume_profile)
+        session = self._sessions.get(session_id)
+        if session:
+            with session["lock"]:
+                session["resume_profile"] = resume_profile
+                session["max_questions"] = max_questions
+                session["history_cap"] = max_questions * HISTORY_CAP_FACTOR
+        return max_questions
+    
     # ===== PRE-GENERATION METHODS =====
     def set_pregenerated_question(self, session_id: str, question: str) -> None:
         """Store a pre-generated next question for faster response."""
-        with self._lock:
-            if session_id in self._sessions:
-                self._sessions[session_id]["pregenerated_question"] = question
-                print(f"[PREGEN] Stored pre-generated question for session {session_id}")
+        if self._sessions.get(session_id) is None:
+            return
+        self._pregen[session_id] = question
+        logger.debug("[PREGEN] Stored pre-generated question for session %s", session_id)
     
     def get_pregenerated_question(self, session_id: str) -> Optional[str]:
         """Get and consume the pre-generated question (returns None if not available)."""
-        with self._lock:
-            if session_id in self._sessions:
-                question = self._sessions[session_id].pop("pregenerated_question", None)
-                if question:
-                    print(f"[PREGEN] Using pre-generated question for session {session_id}")
-                return question
-            return None
+        question = self._pregen.pop(session_id, None)
+        if question:
+            logger.debug("[PREGEN] Using pre-generated question for session %s", session_id)
+        return question
     
     def has_pregenerated_question(self, session_id: str) -> bool:
         """Check if a pre-generated question is available."""
-        session = self.get_session(session_id)
-        return session.get("pregenerated_question") is not None if session else False
+        return session_id in self._pregen
     
     # ===== ERROR TRACKING METHODS =====
     def set_error(self, session_id: str, error: str) -> None:
         """Store an error in session state for graceful handling."""
-        with self._lock:
-            if session_id in self._sessions:
-                self._sessions[session_id]["last_error"] = {
-                    "message": error,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
+        session = self._sessions.get(session_id)
+        if session:
+            # Single key assignment - atomic, no lock needed
+            session["last_error"] = {
+                "message": error,
+                "timestamp": _iso_now()
+            }
     
     def get_error(self, session_id: str) -> Optional[str]:
         """Get the last error for a session."""
-        session = self.get_session(session_id)
+        session = self._peek_session(session_id)
         if session and "last_error" in session:
             return session["last_error"].get("message")
         return None
     
     def clear_error(self, session_id: str) -> None:
         """Clear the error state for a session."""
-        with self._lock:
-            if session_id in self._sessions and "last_error" in self._sessions[session_id]:
-                del self._sessions[session_id]["last_error"]
+        session = self._sessions.get(session_id)
+        if session:
+            session.pop("last_error", None)
     
     # ===== QUESTION TOPIC TRACKING (prevent duplicates) =====
     def add_question_topic(self, session_id: str, question: str) -> None:
         """Track question topics to prevent repetition."""
-        with self._lock:
-            if session_id in self._sessions:
-                if "question_topics" not in self._sessions[session_id]:
-                    self._sessions[session_id]["question_topics"] = []
-                
-                # Extract key words from question for topic matching
-                topic = self._extract_topic(question)
-                self._sessions[session_id]["question_topics"].append(topic)
+        session = self._sessions.get(session_id)
+        if not session:
+            return
+        # Extract key words from question for topic matching (outside the lock)
+        words = set(self._extract_topic(question))
+        with session["lock"]:
+            # Words are stored as ids from a per-session vocab; topics are compact int arrays
+            vocab: Dict[str, int] = session.setdefault("topic_vocab", {})
+            topics: List[array] = session.setdefault("question_topics", [])
+            # Inverted index word id -> topic positions; ids are dense, so it's a plain list
+            index: List[array] = session.setdefault("question_word_index", [])
+            ids = array('i', [vocab.setdefault(w, len(vocab)) for w in words])
+            pos = len(topics)
+            topics.append(ids)
+            for word_id in ids:
+                if word_id == len(index):
+                    index.append(array('i'))
+                index[word_id].append(pos)
     
     def is_duplicate_topic(self, session_id: str, question: str) -> bool:
         """Check if a question covers an already-asked topic."""
-        session = self.get_session(session_id)
-        if not session or "question_topics" not in session:
+        session = self._peek_session(session_id)
+        if not session or "question_word_index" not in session:
             return False
         
-        new_topic = self._extract_topic(question)
-        existing_topics = session["question_topics"]
+        vocab = session["topic_vocab"]
+        index = session["question_word_index"]
+        # Words never seen before can't match any earlier topic
+        new_ids = {vocab[w] for w in self._extract_topic(question) if w in vocab}
         
-        # Check for significant overlap
-        for existing in existing_topics:
-            overlap = len(set(new_topic) & set(existing))
-            if overlap >= 3:  # 3+ words in common = duplicate
-                return True
-        return False
+        # Count shared words per earlier topic via the inverted index
+        hits = Counter(pos for word_id in new_ids for pos in index[word_id])
+        return any(count >= 3 for count in hits.values())  # 3+ words in common = duplicate
     
     def _extract_topic(self, question: str) -> List[str]:
         """Extract key topic words from a question."""
         # Remove common words and punctuation
-        stop_words = {'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 
-                      'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
-                      'would', 'could', 'should', 'may', 'might', 'must', 'shall',
-                      'can', 'about', 'your', 'you', 'me', 'tell', 'what', 'how',
-                      'why', 'when', 'where', 'which', 'who', 'with', 'and', 'or',
-                      'to', 'of', 'in', 'for', 'on', 'at', 'by', 'from', 'that',
-                      'this', 'it', 'its', 'more', 'some', 'any', 'most'}
-        
-        words = question.lower().replace('?', '').replace('.', '').split()
-        return [w for w in words if w not in stop_words and len(w) > 2]
+        return [w for w in _TOPIC_RE.findall(question.lower()) if w not in _STOP_WORDS]
 
 
 # Global session manager instance
@@ -17,6 +17,9 @@ class Settings(BaseSettings):
     DEEPGRAM_API_KEY: str = ""
     ASSEMBLYAI_API_KEY: str = ""
 
+    # Optional Redis cache for the AI agent (memory recall / first questions)
+    REDIS_URL: str = ""
+
     # Pydantic v2 config
     model_config = {
         "env_file": ".env",
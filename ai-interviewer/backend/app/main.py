@@ -4,6 +4,8 @@ load_dotenv()
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import interview, resume, auth, results, voice_interview, jobs, ats
+from app.routers.jobs import ensure_job_indexes
+from app.services.job_embeddings import job_embedding_service
 
 app = FastAPI(
     title="AI Interview",
@@ -40,6 +42,14 @@ app.include_router(jobs.router, prefix="/api/jobs")
 # ATS Resume Scoring routes
 app.include_router(ats.router, prefix="/api/ats")
 
+@app.on_event("startup")
+async def create_job_indexes():
+    await ensure_job_indexes()
+
+@app.on_event("shutdown")
+async def close_embedding_client():
+    await job_embedding_service.aclose()
+
 @app.get("/")
 async def root():
     return {"message": "Backend running successfully"}
@@ -1,21 +1,81 @@
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from bson import ObjectId
+from pymongo.errors import PyMongoError
 import os
+import re
 import hashlib
 import numpy as np
-from cachetools import TTLCache
+from cachetools import LRUCache
 
 from app.db.mongo_clients import db
 from app.services.Similarity_Jobs import Job_Matcher
-from app.services.job_embeddings import job_embedding_service
+from app.services.job_embeddings import job_embedding_service, job_match_index, seniority_category
 from langchain_openai import OpenAIEmbeddings
 
 router = APIRouter(tags=["Jobs"])
 
-# Cache for match results: key = f"{userId}_{resume_hash}", TTL = 1 hour
-match_cache = TTLCache(maxsize=100, ttl=3600)
+# Projections so job queries skip unused fields - above all the ~1536-float embedding
+LIST_PROJECTION = {
+    "title": 1, "company": 1, "location": 1, "experience_level": 1,
+    "job_type": 1, "skills": 1, "is_active": 1
+}
+UNSCORED_PROJECTION = {**LIST_PROJECTION, "description": 1}
+RECOMMEND_PROJECTION = {
+    "title": 1, "company": 1, "location": 1, "experience_level": 1, "job_type": 1,
+    "skills": 1, "description": 1, "salary_range": 1, "posted_date": 1
+}
+
+# Weighted full-text index over the searchable job fields (MongoDB allows one text index per collection)
+JOB_TEXT_INDEX_WEIGHTS = {"title": 10, "skills": 5, "company": 3, "description": 1}
+
+# Seniority fit (0-1) by (user category, job category); pairs not listed score 0.2
+SENIORITY_SCORES = {
+    ("entry", "entry"): 1.0, ("mid", "mid"): 1.0, ("senior", "senior"): 1.0,
+    ("mid", "entry"): 0.5, ("mid", "senior"): 0.5,
+    ("entry", "mid"): 0.5, ("senior", "mid"): 0.5
+}
+
+# Cache for match results, one entry per user: key = f"{userId}:{resume_sha256}:{build_id}".
+# build_id changes with every match index (re)load, so added, edited or deleted jobs show up
+# after the next index refresh, the same as for uncached requests
+match_cache = LRUCache(maxsize=1024)
+
+
+async def ensure_job_indexes() -> None:
+    """
+    Create the job search indexes and backfill the lowercase filter fields.
+    Runs at startup; every step is a no-op once done.
+    """
+    try:
+        # Only one text index is allowed per collection: drop a legacy one (e.g. the old
+        # unweighted title_text_company_text) before creating the weighted index
+        for name, info in (await db.jobs.index_information()).items():
+            is_text = any(kind == "text" for _, kind in info["key"])
+            if is_text and (name != "job_text_weighted" or info.get("weights") != JOB_TEXT_INDEX_WEIGHTS):
+                print(f"[JOBS] Dropping legacy text index {name}")
+                await db.jobs.drop_index(name)
+        await db.jobs.create_index(
+            [(field, "text") for field in JOB_TEXT_INDEX_WEIGHTS],
+            weights=JOB_TEXT_INDEX_WEIGHTS,
+            name="job_text_weighted"
+        )
+    except PyMongoError as e:
+        print(f"[JOBS] Weighted text index not created: {e}")
+    try:
+        await db.jobs.create_index([("location_lower", 1)])
+        await db.jobs.create_index([("experience_level_lower", 1)])
+        # Jobs inserted before the lowercase copies existed, or by other tools
+        await db.jobs.update_many(
+            {"location_lower": {"$exists": False}},
+            [{"$set": {
+                "location_lower": {"$toLower": "$location"},
+                "experience_level_lower": {"$toLower": "$experience_level"}
+            }}]
+        )
+    except PyMongoError as e:
+        print(f"[JOBS] Filter indexes not ready: {e}")
 
 
 # Response schemas
@@ -33,19 +93,18 @@ class JobResponse(BaseModel):
     application_url: Optional[str] = None
     is_active: bool = True
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "jobId": "507f1f77bcf86cd799439011",
-                "title": "Senior Software Engineer",
-                "company": "Google",
-                "location": "Mountain View, CA",
-                "experience_level": "Senior",
-                "job_type": "Full-time",
-                "skills": ["Python", "React", "AWS"],
-                "is_active": True
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "jobId": "507f1f77bcf86cd799439011",
+            "title": "Senior Software Engineer",
+            "company": "Google",
+            "location": "Mountain View, CA",
+            "experience_level": "Senior",
+            "job_type": "Full-time",
+            "skills": ["Python", "React", "AWS"],
+            "is_active": True
         }
+    })
 
 
 class JobsListResponse(BaseModel):
@@ -70,19 +129,21 @@ async def get_all_jobs(
     Query Parameters:
     - page: Page number (default: 1)
     - limit: Items per page (default: 20, max: 100)
-    - location: Filter by location (case-insensitive partial match)
-    - experience_level: Filter by experience level
+    - location: Filter by location (case-insensitive, matches locations starting with it)
+    - experience_level: Filter by experience level (case-insensitive, comma-separated for several)
     - skills: Filter by skills (comma-separated, e.g., "Python,React")
     """
     
     # Build query - TEMPORARILY REMOVED is_active FILTER FOR DEBUGGING
     query = {}
     
+    # Both filters hit indexed lowercase copies: an anchored prefix scan and an equality match
     if location:
-        query["location"] = {"$regex": location, "$options": "i"}
+        query["location_lower"] = {"$regex": "^" + re.escape(location.strip().lower())}
     
     if experience_level:
-        query["experience_level"] = {"$regex": experience_level, "$options": "i"}
+        levels = [lvl.strip().lower() for lvl in experience_level.split(",")]
+        query["experience_level_lower"] = {"$in": levels}
     
     if skills:
         skill_list = [s.strip() for s in skills.split(",")]
@@ -96,7 +157,7 @@ async def get_all_jobs(
     total_pages = (total + limit - 1) // limit
     
     # Get jobs with consistent sorting
-    jobs_cursor = db.jobs.find(query).sort("_id", 1).skip(skip).limit(limit)
+    jobs_cursor = db.jobs.find(query, LIST_PROJECTION).sort("_id", 1).skip(skip).limit(limit)
     jobs = await jobs_cursor.to_list(length=limit)
     
     # Format response
@@ -132,7 +193,7 @@ async def get_job_by_id(jobId: str):
     except:
         raise HTTPException(status_code=400, detail="Invalid job ID format")
     
-    job = await db.jobs.find_one({"_id": job_obj_id})
+    job = await db.jobs.find_one({"_id": job_obj_id}, {"embedding": 0, "embedding_f16": 0})
     
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -160,7 +221,7 @@ async def search_jobs(
     limit: int = Query(20, ge=1, le=100)
 ):
     """
-    Search jobs by keyword (searches in title and company).
+    Search jobs by keyword (weighted: title, then skills, company and description).
     """
     
     # Text search query
@@ -179,7 +240,7 @@ async def search_jobs(
     # Get jobs with text search score
     jobs_cursor = db.jobs.find(
         query,
-        {"score": {"$meta": "textScore"}}
+        {**LIST_PROJECTION, "score": {"$meta": "textScore"}}
     ).sort([("score", {"$meta": "textScore"})]).skip(skip).limit(limit)
     
     jobs = await jobs_cursor.to_list(length=limit)
@@ -227,7 +288,7 @@ async def get_recommended_jobs(userId: str):
     resume_profile = user.get("resumeProfile")
     if not resume_profile:
         # No resume - return recent jobs
-        jobs_cursor = db.jobs.find({}).sort("posted_date", -1).limit(6)
+        jobs_cursor = db.jobs.find({}, RECOMMEND_PROJECTION).sort("posted_date", -1).limit(6)
         jobs = await jobs_cursor.to_list(length=6)
         
         return {
@@ -251,73 +312,33 @@ async def get_recommended_jobs(userId: str):
         }
     
     # Extract user skills and seniority
-    user_skills = set([s.lower() for s in resume_profile.get("skills", [])])
-    user_seniority = resume_profile.get("seniority_level", "").lower()
-    
-    # Seniority level mapping
-    seniority_map = {
-        "entry": ["entry", "junior", "graduate", "trainee", "intern", "associate"],
-        "mid": ["mid", "intermediate", "mid-level"],
-        "senior": ["senior", "staff", "principal", "lead", "manager", "tech lead", "engineering manager", "distinguished"]
-    }
-    
-    # Determine user's seniority category
-    user_category = "mid"  # default
-    for category, keywords in seniority_map.items():
-        if any(keyword in user_seniority for keyword in keywords):
-            user_category = category
-            break
-    
-    # Fetch all active jobs
-    jobs_cursor = db.jobs.find({})
-    all_jobs = await jobs_cursor.to_list(length=None)
-    
-    # Score each job
-    scored_jobs = []
-    for job in all_jobs:
-        job_skills = set([s.lower() for s in job.get("skills", [])])
-        job_seniority = job.get("experience_level", "").lower()
-        
-        # Calculate skill match score (0-1)
-        if len(job_skills) > 0:
-            matching_skills = user_skills.intersection(job_skills)
-            skill_score = len(matching_skills) / len(job_skills)
-        else:
-            skill_score = 0
-        
-        # Calculate seniority match score (0-1)
-        job_category = "mid"  # default
-        for category, keywords in seniority_map.items():
-            if any(keyword in job_seniority for keyword in keywords):
-                job_category = category
-                break
-        
-        if job_category == user_category:
-            seniority_score = 1.0
-        elif (user_category == "mid" and job_category in ["entry", "senior"]) or \
-             (user_category == "entry" and job_category == "mid") or \
-             (user_category == "senior" and job_category == "mid"):
-            seniority_score = 0.5
-        else:
-            seniority_score = 0.2
-        
-        # Calculate final score (weighted)
-        final_score = (skill_score * 0.6) + (seniority_score * 0.3) + (0.1)  # 10% base score
-        
-        scored_jobs.append({
-            "job": job,
-            "score": final_score,
-            "skill_matches": len(user_skills.intersection(job_skills)) if len(job_skills) > 0 else 0
-        })
-    
-    # Sort by score and get top 6
-    scored_jobs.sort(key=lambda x: x["score"], reverse=True)
-    top_jobs = scored_jobs[:6]
+    user_skills = frozenset(s.lower() for s in resume_profile.get("skills", []))
+    user_category = seniority_category(resume_profile.get("seniority_level", ""))
+    
+    # All jobs, with skill sets and seniority categories precomputed, from the in-process index
+    index = await job_match_index.get_or_build()
+    
+    # Score every job at once
+    # Skill match score (0-1); jobs without skills have no matches, so score 0
+    skill_matches = index.skill_match_counts(user_skills)
+    skill_scores = skill_matches / np.maximum(index.skill_counts, 1)
+    # Seniority match score (0-1)
+    seniority_scores = np.fromiter(
+        (SENIORITY_SCORES.get((user_category, job_category), 0.2) for job_category in index.categories),
+        dtype=np.float64, count=len(index.jobs)
+    )
+    # Final score (weighted)
+    scores = (skill_scores * 0.6) + (seniority_scores * 0.3) + (0.1)  # 10% base score
+    
+    # Top 6 by score: O(N) partition, then order just those 6 (ties by corpus order)
+    top_n = min(6, len(scores))
+    top_idx = np.argpartition(-scores, top_n - 1)[:top_n] if top_n else np.empty(0, dtype=np.intp)
+    top_idx = top_idx[np.lexsort((top_idx, -scores[top_idx]))]
     
     # Format response
     recommendations = []
-    for item in top_jobs:
-        job = item["job"]
+    for i in top_idx.tolist():
+        job = index.jobs[i]
         recommendations.append({
             "jobId": str(job["_id"]),
             "title": job.get("title", ""),
@@ -329,8 +350,8 @@ async def get_recommended_jobs(userId: str):
             "description": job.get("description", ""),
             "salary_range": job.get("salary_range"),
             "posted_date": job.get("posted_date"),
-            "match_score": round(item["score"] * 100),  # Convert to percentage
-            "matching_skills": item["skill_matches"]
+            "match_score": round(float(scores[i]) * 100),  # Convert to percentage
+            "matching_skills": int(skill_matches[i])
         })
     
     return {
@@ -363,18 +384,17 @@ async def get_matched_jobs(
     
     resume_profile = user.get("resumeProfile")
     
-    # Fetch all jobs
-    jobs_cursor = db.jobs.find({})
-    all_jobs = await jobs_cursor.to_list(length=None)
-    
     if not resume_profile or not resume_profile.get("skills"):
-        # No resume - return jobs without scores
-        total = len(all_jobs)
+        # No resume - return jobs without scores, paginated by Mongo
+        total = await db.jobs.count_documents({})
         total_pages = (total + limit - 1) // limit
         skip = (page - 1) * limit
         
+        jobs_cursor = db.jobs.find({}, UNSCORED_PROJECTION).sort("_id", 1).skip(skip).limit(limit)
+        jobs = await jobs_cursor.to_list(length=limit)
+        
         formatted_jobs = []
-        for job in all_jobs[skip:skip+limit]:
+        for job in jobs:
             formatted_jobs.append({
                 "jobId": str(job["_id"]),
                 "title": job.get("title", ""),
@@ -399,14 +419,19 @@ async def get_matched_jobs(
             "message": "Upload resume for personalized match scores"
         }
     
-    # Create cache key based on userId and resume skills hash
+    # All jobs, with normalized embeddings, from the in-process index
+    index = await job_match_index.get_or_build()
+    
+    # Create cache key from userId, the full hash of what scoring reads from the resume,
+    # and the match index build it was scored against
     skills_str = ",".join(sorted(resume_profile.get("skills", [])))
-    resume_hash = hashlib.md5(skills_str.encode()).hexdigest()[:8]
-    cache_key = f"{userId}_{resume_hash}"
+    resume_key = f"{skills_str}\n{resume_profile.get('experience', '')}"
+    resume_hash = hashlib.sha256(resume_key.encode()).hexdigest()
+    cache_key = f"{userId}:{resume_hash}:{index.build_id}"
     
     # Check cache for existing results
-    if cache_key in match_cache:
-        cached_results = match_cache[cache_key]
+    cached_results = match_cache.get(cache_key)
+    if cached_results is not None:
         # Apply pagination to cached results
         total = len(cached_results)
         total_pages = (total + limit - 1) // limit
@@ -420,82 +445,48 @@ async def get_matched_jobs(
             "message": "Jobs sorted by match percentage (cached)"
         }
     
+    all_jobs = index.jobs
+    
     # User skills for matching
-    user_skills = set([s.lower() for s in resume_profile.get("skills", [])])
+    user_skills = frozenset(s.lower() for s in resume_profile.get("skills", []))
+    
+    # Skill score for every job at once from the index's flattened skill table
+    skill_scores = index.skill_match_counts(user_skills) / np.maximum(index.skill_counts, 1) * 100
+    embedding_scores = np.zeros(len(all_jobs), dtype=np.float32)
+    final_scores = skill_scores
+    candidates = np.arange(len(all_jobs))
     
     # Check if we can use embedding-based matching
     # Jobs need pre-computed embeddings, otherwise use skill-only matching
-    jobs_with_embeddings = [j for j in all_jobs if j.get("embedding")]
-    use_embeddings = len(jobs_with_embeddings) > 0 and job_embedding_service.embeddings
-    
-    scored_jobs = []
-    
-    if use_embeddings:
+    if index.has_embeddings and job_embedding_service.client:
         # Get resume embedding (single API call)
-        resume_embedding = await job_embedding_service.get_resume_embedding(resume_profile)
+        resume_embedding = await job_embedding_service.get_resume_embedding(resume_profile, user)
         
         if resume_embedding:
-            resume_vec = np.array(resume_embedding)
-            
-            for job in all_jobs:
-                job_skills = job.get("skills", [])
-                job_skills_lower = set([s.lower() for s in job_skills])
-                
-                # Skill matching
-                matched_skills = list(user_skills & job_skills_lower)
-                missing_skills = list(job_skills_lower - user_skills)
-                skill_score = (len(matched_skills) / max(len(job_skills_lower), 1)) * 100
-                
-                # Embedding matching (if job has pre-computed embedding)
-                job_embedding = job.get("embedding")
-                if job_embedding:
-                    job_vec = np.array(job_embedding)
-                    # Cosine similarity
-                    embedding_score = float(np.dot(resume_vec, job_vec) / 
-                                           (np.linalg.norm(resume_vec) * np.linalg.norm(job_vec) + 1e-10)) * 100
-                    # Weighted final score: 65% embedding + 35% skill
-                    final_score = 0.65 * embedding_score + 0.35 * skill_score
-                else:
-                    embedding_score = 0
-                    final_score = skill_score
-                
-                scored_jobs.append({
-                    "job": job,
-                    "final_score": final_score,
-                    "embedding_score": embedding_score,
-                    "skill_score": skill_score,
-                    "matched_skills": matched_skills,
-                    "missing_skills": missing_skills
-                })
-        else:
-            use_embeddings = False
-    
-    if not use_embeddings:
-        # Skill-only matching (fastest)
-        for job in all_jobs:
-            job_skills = job.get("skills", [])
-            job_skills_lower = set([s.lower() for s in job_skills])
-            
-            matched_skills = list(user_skills & job_skills_lower)
-            missing_skills = list(job_skills_lower - user_skills)
-            skill_score = (len(matched_skills) / max(len(job_skills_lower), 1)) * 100
-            
-            scored_jobs.append({
-                "job": job,
-                "final_score": skill_score,
-                "embedding_score": 0,
-                "skill_score": skill_score,
-                "matched_skills": matched_skills,
-                "missing_skills": missing_skills
-            })
-    
-    # Sort by final_score (descending)
-    scored_jobs.sort(key=lambda x: x["final_score"], reverse=True)
+            # Cosine similarity for every job at once: both sides are unit-norm, so one matmul
+            resume_vec = np.asarray(resume_embedding, dtype=np.float32)
+            rows, scores = index.embedding_scores(resume_vec)
+            scored = index.embedded_idx[rows]
+            embedding_scores[scored] = scores
+            # Weighted final score for jobs with an embedding: 65% embedding + 35% skill
+            final_scores = skill_scores.copy()
+            final_scores[scored] = 0.65 * scores + 0.35 * skill_scores[scored]
+            if len(scored) < len(index.embedded_idx):
+                # ANN search: embedded jobs outside the nearest candidates are left out
+                # rather than ranked at 0 similarity below jobs with no embedding at all
+                keep = np.ones(len(all_jobs), dtype=bool)
+                keep[index.embedded_idx] = False
+                keep[scored] = True
+                candidates = np.flatnonzero(keep)
+    
+    # Sort by final score (descending); stable, so ties keep corpus order
+    order = candidates[np.argsort(-final_scores[candidates], kind="stable")]
     
     # Format all results for caching
     all_formatted = []
-    for item in scored_jobs:
-        job = item["job"]
+    for i in order.tolist():
+        job = all_jobs[i]
+        job_skills_lower = index.skills[i]
         all_formatted.append({
             "jobId": str(job["_id"]),
             "title": job.get("title", ""),
@@ -505,11 +496,11 @@ async def get_matched_jobs(
             "job_type": job.get("job_type"),
             "skills": job.get("skills", []),
             "description": job.get("description", ""),
-            "match_percentage": round(item["final_score"]),
-            "embedding_score": round(item["embedding_score"]),
-            "skill_score": round(item["skill_score"]),
-            "matched_skills": item["matched_skills"],
-            "missing_skills": item["missing_skills"],
+            "match_percentage": round(float(final_scores[i])),
+            "embedding_score": round(float(embedding_scores[i])),
+            "skill_score": round(float(skill_scores[i])),
+            "matched_skills": list(user_skills & job_skills_lower),
+            "missing_skills": list(job_skills_lower - user_skills),
             "has_match_data": True
         })
     
@@ -538,4 +529,6 @@ async def compute_job_embeddings():
     Run this once to enable fast embedding-based matching.
     """
     result = await job_embedding_service.compute_all_embeddings()
+    # New embeddings must show up in matching right away, not after the index TTL
+    job_match_index.invalidate()
     return result
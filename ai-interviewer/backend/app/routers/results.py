@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from bson import ObjectId
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from app.db.mongo_clients import db
 
@@ -26,24 +26,23 @@ class ResultResponse(BaseModel):
     assessment: Optional[AssessmentData] = None
     createdAt: Optional[str] = None
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "resultId": "507f1f77bcf86cd799439011",
-                "userId": "507f1f77bcf86cd799439012",
-                "sessionId": "507f1f77bcf86cd799439013",
-                "candidateName": "John Doe",
-                "candidateEmail": "john.doe@example.com",
-                "assessment": {
-                    "candidate_score_percent": 85,
-                    "summary": "Strong technical skills with good communication",
-                    "strengths": ["Problem solving", "Technical knowledge"],
-                    "weaknesses": ["Could improve on system design"],
-                    "recommendations": ["Practice more system design questions"]
-                },
-                "createdAt": "2024-01-15T10:30:00Z"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "resultId": "507f1f77bcf86cd799439011",
+            "userId": "507f1f77bcf86cd799439012",
+            "sessionId": "507f1f77bcf86cd799439013",
+            "candidateName": "John Doe",
+            "candidateEmail": "john.doe@example.com",
+            "assessment": {
+                "candidate_score_percent": 85,
+                "summary": "Strong technical skills with good communication",
+                "strengths": ["Problem solving", "Technical knowledge"],
+                "weaknesses": ["Could improve on system design"],
+                "recommendations": ["Practice more system design questions"]
+            },
+            "createdAt": "2024-01-15T10:30:00Z"
         }
+    })
 
 
 @router.get("/user/{userId}", response_model=List[ResultResponse])
@@ -27,6 +27,7 @@ async def voice_interview_websocket(websocket: WebSocket, session_id: str):
     - {"type": "audio", "data": "<base64-encoded-audio>"}
     - {"type": "start"}
     - {"type": "end"}
+    - {"type": "speech_end"}  (client VAD detected end of speech)
     
     Server sends:
     - {"type": "question", "text": "...", "questionNumber": 1}
@@ -146,6 +147,10 @@ async def voice_interview_websocket(websocket: WebSocket, session_id: str):
                         
                         break
                     
+                    elif message_type == "speech_end":
+                        # Client-side VAD saw the candidate stop; finalize without waiting for Deepgram's timers
+                        await session.end_of_speech()
+                    
                     elif message_type == "ping":
                         # Keepalive ping
                         await websocket.send_json({"type": "pong"})
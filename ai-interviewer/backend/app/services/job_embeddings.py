@@ -3,28 +3,133 @@ Job Embeddings Service
 Manages pre-computed embeddings for jobs to speed up matching.
 """
 import os
+import re
+import time
+import hashlib
 import asyncio
-from typing import List, Optional
-from langchain_openai import OpenAIEmbeddings
+from typing import Dict, List, Optional, Tuple
+import httpx
+import numpy as np
+from cachetools import TTLCache
+from bson import Binary
+from pymongo import UpdateOne
+from openai import AsyncOpenAI
 from app.db.mongo_clients import db
 
+# Optional HNSW index for large job corpora (`pip install hnswlib`); without it,
+# or below ANN_MIN_JOBS embedded jobs, matching scores every job with one matmul
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+# Only the job fields matching and the /matched and /recommended responses use
+MATCH_PROJECTION = {
+    "title": 1, "company": 1, "location": 1, "experience_level": 1, "job_type": 1,
+    "skills": 1, "description": 1, "salary_range": 1, "posted_date": 1,
+    "embedding": 1, "embedding_f16": 1
+}
+
+# Seniority keywords per category; the first category with a keyword in the text wins
+SENIORITY_MAP = {
+    "entry": ["entry", "junior", "graduate", "trainee", "intern", "associate"],
+    "mid": ["mid", "intermediate", "mid-level"],
+    "senior": ["senior", "staff", "principal", "lead", "manager", "tech lead", "engineering manager", "distinguished"]
+}
+
+
+def unit_vector(embedding) -> np.ndarray:
+    """L2-normalize an embedding as float32, so cosine similarity is a plain dot product."""
+    vec = np.asarray(embedding, dtype=np.float32)
+    return vec / (np.linalg.norm(vec) + 1e-10)
+
+
+def quantize_int8(matrix: np.ndarray):
+    """Symmetric per-row int8 quantization: returns (int8 matrix, float32 row scales)."""
+    scales = np.maximum(np.abs(matrix).max(axis=1), 1e-12) / 127
+    q = np.clip(np.round(matrix / scales[:, None]), -127, 127).astype(np.int8)
+    return q, scales.astype(np.float32)
+
+
+def pack_embedding(embedding: List[float]) -> Binary:
+    """
+    Pack an embedding as unit-norm raw float16 bytes - a quarter of a BSON double
+    array, no per-element decode, and no normalization left for query time.
+    """
+    return Binary(unit_vector(embedding).astype(np.float16).tobytes())
+
+
+def unpack_embedding(doc: dict) -> Optional[np.ndarray]:
+    """Read a job's unit-norm embedding as float32, from the packed field or a legacy list; None if absent."""
+    packed = doc.get("embedding_f16")
+    if packed:
+        return np.frombuffer(packed, dtype=np.float16).astype(np.float32)
+    legacy = doc.get("embedding")
+    return unit_vector(legacy) if legacy else None
+
+
+# All of SENIORITY_MAP as one regex: a lookahead per category, tried in map order, so a
+# single search answers "first category with a keyword anywhere in the text"
+SENIORITY_RE = re.compile(
+    "^(?:" + "|".join(
+        f"(?=.*(?:{'|'.join(map(re.escape, keywords))}))(?P<{category}>)"
+        for category, keywords in SENIORITY_MAP.items()
+    ) + ")",
+    re.IGNORECASE | re.DOTALL
+)
+
+
+def seniority_category(level: str) -> str:
+    """Map a free-text seniority / experience level to entry, mid or senior (default mid)."""
+    m = SENIORITY_RE.search(level)
+    return m.lastgroup if m else "mid"
+
+
+# Optional CUDA scoring for corpora this large; torch is imported only then
+GPU_MIN_JOBS = 50000
+
+ANN_MIN_JOBS = 20000
+ANN_TOP_K = 200
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# JOB_MATCH_INT8=1 keeps the match matrix as int8 + a per-row scale: a quarter of the
+# float32 memory for big corpora, at <1% cosine error. Scored in row blocks so the
+# dequantized temporary stays small; float32 (the default) is the exact path
+INT8_MATRIX = os.getenv("JOB_MATCH_INT8", "0") == "1"
+INT8_BLOCK_ROWS = 8192
+
 
 class JobEmbeddingService:
     """Service for managing job embeddings stored in MongoDB."""
     
     def __init__(self):
-        self.embeddings = None
+        self.client: Optional[AsyncOpenAI] = None
+        self._http: Optional[httpx.AsyncClient] = None
+        # Resume embeddings by sha256 of the embedded text: unchanged resumes skip the API
+        self.resume_embedding_cache = TTLCache(maxsize=1000, ttl=86400)
         self._init_embeddings()
     
     def _init_embeddings(self):
-        """Initialize OpenAI embeddings if API key is available."""
+        """Initialize the OpenAI client if API key is available."""
         api_key = os.getenv("OPENAI_API_KEY")
         if api_key:
-            self.embeddings = OpenAIEmbeddings(
-                model="text-embedding-3-small",
-                openai_api_key=api_key
+            # One pooled HTTP client for every embedding call, so TCP/TLS connections are reused
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+                timeout=httpx.Timeout(30.0, connect=5.0)
+            )
+            self.client = AsyncOpenAI(
+                api_key=api_key,
+                http_client=self._http,
+                max_retries=6  # The client backs off on 429s, so bulk runs need no manual sleeps
             )
     
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client (app shutdown)."""
+        if self._http is not None:
+            await self._http.aclose()
+    
     def build_job_text(self, job: dict) -> str:
         """Build searchable text from job for embedding."""
         title = job.get("title", "")
@@ -32,20 +137,25 @@ class JobEmbeddingService:
         skills = ", ".join(job.get("skills", []))
         return f"{title}\n{description}\nSkills: {skills}"
     
+    @staticmethod
+    def text_sha(job_text: str) -> str:
+        """Hash of the embedded text, stored as embedding_text_sha to detect stale embeddings."""
+        return hashlib.sha256(job_text.encode()).hexdigest()
+    
     async def compute_single_embedding(self, text: str) -> Optional[List[float]]:
         """Compute embedding for a single text."""
-        if not self.embeddings:
+        embeddings = await self.compute_embeddings([text])
+        return embeddings[0] if embeddings else None
+    
+    async def compute_embeddings(self, texts: List[str]) -> Optional[List[List[float]]]:
+        """Compute embeddings for many texts in one API round-trip."""
+        if not self.client:
             return None
         try:
-            # Run in executor since embed_documents is synchronous
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None, 
-                lambda: self.embeddings.embed_documents([text])
-            )
-            return result[0] if result else None
+            response = await self.client.embeddings.create(model=EMBEDDING_MODEL, input=texts)
+            return [item.embedding for item in response.data]
         except Exception as e:
-            print(f"Error computing embedding: {e}")
+            print(f"Error computing embeddings: {e}")
             return None
     
     async def compute_job_embedding(self, job: dict) -> Optional[List[float]]:
@@ -54,47 +164,71 @@ class JobEmbeddingService:
         embedding = await self.compute_single_embedding(job_text)
         
         if embedding:
-            # Store embedding in database
+            # Store embedding in database, with the hash of the text it was computed from
             await db.jobs.update_one(
                 {"_id": job["_id"]},
-                {"$set": {"embedding": embedding}}
+                {"$set": {"embedding_f16": pack_embedding(embedding), "embedding_text_sha": self.text_sha(job_text)}}
             )
         
         return embedding
     
-    async def compute_all_embeddings(self, batch_size: int = 10) -> dict:
+    async def compute_all_embeddings(self, batch_size: int = 100, concurrency: int = 8) -> dict:
         """
-        Compute embeddings for all jobs that don't have them.
-        Processes in batches to avoid rate limiting.
+        Compute embeddings for all jobs that don't have one or whose title, description
+        or skills changed since it was computed (embedding_text_sha differs).
+        Each batch of `batch_size` jobs is one multi-input embedding call and one bulk
+        write; up to `concurrency` batches are in flight at once.
         """
-        if not self.embeddings:
+        if not self.client:
             return {"error": "OpenAI API key not configured"}
         
-        # Find jobs without embeddings
-        jobs_cursor = db.jobs.find({"embedding": {"$exists": False}})
-        jobs = await jobs_cursor.to_list(length=None)
+        text_fields = {"title": 1, "description": 1, "skills": 1}
+        
+        # Embeddings stored before hashes existed are taken as current: record their hash
+        # once instead of paying to re-embed the whole corpus
+        legacy = await db.jobs.find(
+            {"embedding_text_sha": {"$exists": False},
+             "$or": [{"embedding": {"$exists": True}}, {"embedding_f16": {"$exists": True}}]},
+            text_fields
+        ).to_list(length=None)
+        if legacy:
+            await db.jobs.bulk_write(
+                [UpdateOne({"_id": job["_id"]}, {"$set": {"embedding_text_sha": self.text_sha(self.build_job_text(job))}})
+                 for job in legacy],
+                ordered=False
+            )
+        
+        # Jobs whose current text doesn't hash to the stored value - new (no hash yet) or edited
+        jobs = []
+        async for job in db.jobs.find({}, {**text_fields, "embedding_text_sha": 1}):
+            job_text = self.build_job_text(job)
+            sha = self.text_sha(job_text)
+            if job.get("embedding_text_sha") != sha:
+                jobs.append((job["_id"], job_text, sha))
         
         if not jobs:
-            return {"message": "All jobs already have embeddings", "processed": 0}
-        
-        processed = 0
-        failed = 0
-        
-        # Process in batches
-        for i in range(0, len(jobs), batch_size):
-            batch = jobs[i:i + batch_size]
-            tasks = [self.compute_job_embedding(job) for job in batch]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            for result in results:
-                if isinstance(result, Exception) or result is None:
-                    failed += 1
-                else:
-                    processed += 1
-            
-            # Small delay between batches to avoid rate limiting
-            if i + batch_size < len(jobs):
-                await asyncio.sleep(0.5)
+            return {"message": "All job embeddings are up to date", "processed": 0}
+        
+        sem = asyncio.Semaphore(concurrency)
+        
+        async def run(batch: List[tuple]) -> int:
+            async with sem:
+                vectors = await self.compute_embeddings([job_text for _, job_text, _ in batch])
+            if not vectors:
+                return 0
+            # Embedding and its text hash are written together in one $set
+            await db.jobs.bulk_write(
+                [UpdateOne({"_id": job_id}, {"$set": {"embedding_f16": pack_embedding(vector), "embedding_text_sha": sha}})
+                 for (job_id, _, sha), vector in zip(batch, vectors)],
+                ordered=False
+            )
+            return len(vectors)
+        
+        batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+        results = await asyncio.gather(*(run(batch) for batch in batches), return_exceptions=True)
+        
+        processed = sum(r for r in results if not isinstance(r, Exception))
+        failed = len(jobs) - processed
         
         return {
             "message": "Embedding computation complete",
@@ -103,13 +237,220 @@ class JobEmbeddingService:
             "total": len(jobs)
         }
     
-    async def get_resume_embedding(self, profile: dict) -> Optional[List[float]]:
-        """Compute embedding for a resume profile."""
+    async def get_resume_embedding(self, profile: dict, user: Optional[dict] = None) -> Optional[List[float]]:
+        """
+        Compute the unit-norm embedding of a resume profile, reusing earlier results for
+        the same text.
+        
+        When the user document is given, the embedding is also persisted on it
+        (resumeEmbedding + resumeEmbeddingHash) so it survives restarts. A changed
+        resume hashes differently, so stale embeddings are never returned.
+        """
         skills = ", ".join(profile.get("skills", []))
         experience = profile.get("experience", "")
         resume_text = f"Skills: {skills}\nExperience: {experience}"
-        return await self.compute_single_embedding(resume_text)
+        text_hash = hashlib.sha256(resume_text.encode()).hexdigest()
+        
+        embedding = self.resume_embedding_cache.get(text_hash)
+        if embedding is not None:
+            return embedding
+        
+        if user and user.get("resumeEmbeddingHash") == text_hash and user.get("resumeEmbedding"):
+            embedding = user["resumeEmbedding"]
+        else:
+            embedding = await self.compute_single_embedding(resume_text)
+            if embedding:
+                embedding = unit_vector(embedding).tolist()
+            if embedding and user:
+                await db.users.update_one(
+                    {"_id": user["_id"]},
+                    {"$set": {"resumeEmbedding": embedding, "resumeEmbeddingHash": text_hash}}
+                )
+        
+        if embedding:
+            self.resume_embedding_cache[text_hash] = embedding
+        return embedding
+
+
+class JobMatchIndex:
+    """
+    In-process snapshot of the job corpus used for matching.
+    
+    Holds the job documents (without their embedding lists) plus one C-contiguous
+    float32 matrix of L2-normalized embeddings, so a match request is a single
+    matmul instead of a Mongo scan and N array builds. Rebuilt after `ttl` seconds
+    or when invalidated (e.g. after new embeddings are computed).
+    
+    Builds are single-flight: concurrent callers share one in-flight load. Once a TTL
+    expires the old snapshot keeps being served while the refresh runs; only the first
+    load and loads after invalidate() are waited for.
+    """
+    
+    def __init__(self, ttl: float = 600):
+        self.ttl = ttl
+        self._building: Optional[asyncio.Task] = None
+        self._built_at: Optional[float] = None  # None: never built, or invalidated
+        self._generation = 0  # Bumped by invalidate(); a build started before it doesn't count
+        self.build_id = 0  # Bumped every time a build swaps in a new snapshot; part of every /matched cache key
+        self.jobs: List[dict] = []
+        self.skills: List[frozenset] = []  # Lowercased skills per job, aligned with jobs
+        self.categories: List[str] = []  # seniority_category of each job's experience_level
+        # Flattened (job, skill) pairs - a CSR-style skill matrix without scipy:
+        # skill_ids[k] is a vocab id, skill_owner[k] the position of the job that lists it
+        self.skill_vocab: Dict[str, int] = {}
+        self.skill_ids: np.ndarray = np.empty(0, dtype=np.int32)
+        self.skill_owner: np.ndarray = np.empty(0, dtype=np.intp)
+        self.skill_counts: np.ndarray = np.empty(0, dtype=np.int32)  # Skills per job
+        self.embedded_idx: np.ndarray = np.empty(0, dtype=np.intp)  # Positions in jobs of matrix rows
+        self.matrix: Optional[np.ndarray] = None  # (len(embedded_idx), D) normalized, or None
+        self.q_matrix: Optional[np.ndarray] = None  # int8 form of matrix (JOB_MATCH_INT8), replaces it
+        self.q_scales: Optional[np.ndarray] = None  # Per-row dequantization scales for q_matrix
+        self.gpu_matrix = None  # float16 CUDA copy of matrix, only for very large corpora
+        self.ann = None  # hnswlib index over matrix rows, only for large corpora
+    
+    def invalidate(self) -> None:
+        """Force a rebuild on the next get_or_build()."""
+        self._generation += 1
+        self._built_at = None
+    
+    def _is_fresh(self) -> bool:
+        return self._built_at is not None and time.monotonic() - self._built_at < self.ttl
+    
+    async def get_or_build(self) -> "JobMatchIndex":
+        """Return the index, (re)loading it from MongoDB if stale. Concurrent callers share one load."""
+        if self._is_fresh():
+            return self
+        if self._building is None:
+            self._building = asyncio.create_task(self._build())
+            self._building.add_done_callback(self._build_done)
+        if self._built_at is not None:
+            return self  # Stale but valid - serve it while the refresh runs
+        while self._built_at is None:
+            if self._building is None:  # Invalidated mid-build: that build didn't count
+                self._building = asyncio.create_task(self._build())
+                self._building.add_done_callback(self._build_done)
+            # shield: a cancelled request must not cancel the load other callers wait on
+            await asyncio.shield(self._building)
+        return self
+    
+    def _build_done(self, task: asyncio.Task) -> None:
+        self._building = None
+        if not task.cancelled() and task.exception() is not None:
+            print(f"[JOBS] Match index build failed: {task.exception()}")
+    
+    async def _build(self) -> None:
+        generation = self._generation
+        docs = await db.jobs.find({}, MATCH_PROJECTION).to_list(length=None)
+        
+        jobs, skills, categories, embedded_idx, vectors = [], [], [], [], []
+        for i, doc in enumerate(docs):
+            embedding = unpack_embedding(doc)
+            doc.pop("embedding", None)
+            doc.pop("embedding_f16", None)
+            if embedding is not None:
+                embedded_idx.append(i)
+                vectors.append(embedding)
+            jobs.append(doc)
+            skills.append(frozenset(s.lower() for s in doc.get("skills", [])))
+            categories.append(seniority_category(doc.get("experience_level") or ""))
+        
+        matrix = None
+        if vectors:
+            # Rows are unit-norm already (normalized when stored, or on unpack for legacy lists)
+            matrix = np.ascontiguousarray(np.stack(vectors), dtype=np.float32)
+        
+        skill_vocab: Dict[str, int] = {}
+        skill_ids, skill_owner = [], []
+        for i, job_skills in enumerate(skills):
+            for skill in job_skills:
+                skill_ids.append(skill_vocab.setdefault(skill, len(skill_vocab)))
+                skill_owner.append(i)
+        
+        ann = None
+        if hnswlib is not None and matrix is not None and len(matrix) >= ANN_MIN_JOBS:
+            # Graph construction is CPU-heavy - keep it off the event loop
+            ann = await asyncio.to_thread(self._build_ann, matrix)
+        
+        gpu_matrix = None
+        if ann is None and matrix is not None and len(matrix) >= GPU_MIN_JOBS:
+            try:
+                import torch
+            except ImportError:
+                torch = None
+            if torch is not None and torch.cuda.is_available():
+                gpu_matrix = torch.from_numpy(matrix).to("cuda", dtype=torch.float16)
+        
+        q_matrix = q_scales = None
+        if INT8_MATRIX and matrix is not None:
+            q_matrix, q_scales = quantize_int8(matrix)
+            matrix = None
+        
+        # Swap everything in at once (no await in between)
+        self.jobs = jobs
+        self.skills = skills
+        self.categories = categories
+        self.skill_vocab = skill_vocab
+        self.skill_ids = np.asarray(skill_ids, dtype=np.int32)
+        self.skill_owner = np.asarray(skill_owner, dtype=np.intp)
+        self.skill_counts = np.asarray([len(job_skills) for job_skills in skills], dtype=np.int32)
+        self.embedded_idx = np.asarray(embedded_idx, dtype=np.intp)
+        self.matrix = matrix
+        self.q_matrix = q_matrix
+        self.q_scales = q_scales
+        self.gpu_matrix = gpu_matrix
+        self.ann = ann
+        self.build_id += 1
+        if generation == self._generation:
+            self._built_at = time.monotonic()
+    
+    @staticmethod
+    def _build_ann(matrix: np.ndarray):
+        """Inner-product HNSW over normalized rows, i.e. cosine similarity."""
+        ann = hnswlib.Index(space="ip", dim=matrix.shape[1])
+        ann.init_index(max_elements=len(matrix), ef_construction=200, M=16)
+        ann.add_items(matrix, np.arange(len(matrix)))
+        ann.set_ef(ANN_TOP_K * 2)
+        return ann
+    
+    def skill_match_counts(self, user_skills: frozenset) -> np.ndarray:
+        """Number of the user's (lowercased) skills each job lists, for every job at once."""
+        user_mask = np.zeros(len(self.skill_vocab), dtype=np.float64)
+        user_mask[[self.skill_vocab[s] for s in user_skills if s in self.skill_vocab]] = 1.0
+        return np.bincount(self.skill_owner, weights=user_mask[self.skill_ids], minlength=len(self.jobs))
+    
+    def embedding_scores(self, resume_vec: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Cosine similarity * 100 of a normalized resume vector against the embedded jobs,
+        as (rows, scores) with rows indexing embedded_idx. With the HNSW index only the
+        ANN_TOP_K nearest rows are returned, and callers rank just those candidates among
+        the embedded jobs. Otherwise every row is scored, on the GPU when the corpus is
+        large enough and CUDA is available.
+        """
+        if self.ann is None:
+            rows = np.arange(len(self.embedded_idx))
+            if self.gpu_matrix is not None:
+                import torch  # Already loaded by _build when gpu_matrix was set
+                resume = torch.from_numpy(resume_vec).to("cuda", dtype=torch.float16)
+                return rows, (self.gpu_matrix @ resume).float().cpu().numpy() * 100
+            if self.q_matrix is not None:
+                return rows, self._int8_scores(resume_vec) * 100
+            return rows, (self.matrix @ resume_vec) * 100
+        labels, distances = self.ann.knn_query(resume_vec, k=min(ANN_TOP_K, len(self.embedded_idx)))
+        return labels[0].astype(np.intp), (1.0 - distances[0]) * 100  # "ip" distance is 1 - dot
+    
+    @property
+    def has_embeddings(self) -> bool:
+        return len(self.embedded_idx) > 0
+    
+    def _int8_scores(self, resume_vec: np.ndarray) -> np.ndarray:
+        """Dot products against the int8 matrix, one dequantized block at a time."""
+        scores = np.empty(len(self.q_matrix), dtype=np.float32)
+        for start in range(0, len(self.q_matrix), INT8_BLOCK_ROWS):
+            block = self.q_matrix[start:start + INT8_BLOCK_ROWS]
+            scores[start:start + len(block)] = block.astype(np.float32) @ resume_vec
+        return scores * self.q_scales
 
 
-# Singleton instance
+# Singleton instances
 job_embedding_service = JobEmbeddingService()
+job_match_index = JobMatchIndex()
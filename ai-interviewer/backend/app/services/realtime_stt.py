@@ -4,8 +4,12 @@ Handles audio streaming and returns transcriptions in real-time.
 """
 
 import asyncio
+import dataclasses
 import json
-from typing import Optional, Callable, AsyncIterator
+import logging
+import random
+import time
+from typing import Optional, Callable, AsyncIterator, List, Union
 from deepgram import (
     DeepgramClient,
     DeepgramClientOptions,
@@ -14,6 +18,99 @@ from deepgram import (
 )
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+# Deepgram closes a stream after ~10s without data; a KeepAlive is sent after this much silence
+KEEPALIVE_INTERVAL = 3.0
+KEEPALIVE_MESSAGE = json.dumps({"type": "KeepAlive"})
+FINALIZE_MESSAGE = json.dumps({"type": "Finalize"})
+
+SAMPLE_RATE = 16000  # linear16 mono, 2 bytes per sample
+FRAME_MS = 200  # mic chunks smaller than this are coalesced before sending
+
+# Most audio held back while Deepgram is slow or reconnecting; older audio is dropped first
+MAX_BUFFERED_MS = 5000
+MAX_PENDING_BYTES = SAMPLE_RATE * 2 * MAX_BUFFERED_MS // 1000  # 160000, preallocated once
+
+# Frames waiting for the Deepgram socket; when full the oldest is dropped so the mic never blocks
+SEND_QUEUE_SIZE = MAX_BUFFERED_MS // FRAME_MS
+SEND_DRAIN_TIMEOUT = 2.0  # stop() waits this long for queued audio to go out
+
+# Backoff before each reconnect attempt, plus up to RECONNECT_JITTER seconds of jitter
+RECONNECT_DELAYS = (0.25, 0.5, 1.0, 2.0, 5.0)
+RECONNECT_JITTER = 0.5
+
+# websockets-level ping cadence for the Deepgram socket. The library default (20s/20s) can close a
+# socket whose pong is stuck behind queued audio; KeepAlive frames already cover Deepgram's idle timeout.
+WS_PING_INTERVAL = 30.0
+WS_PING_TIMEOUT = 30.0
+
+# Deepgram accepts at most 100 keyterms per stream
+KEYTERM_LIMIT = 100
+
+# Static Deepgram configuration, built once and shared by every session and reconnect.
+# No SDK "keepalive" option: _keepalive_loop is the only KeepAlive writer on the socket
+_CLIENT_OPTIONS = DeepgramClientOptions()
+_LIVE_OPTIONS = LiveOptions(
+    # Nova-3 formats in one pass and takes keyterm prompts, so names and tech terms come out right
+    # without post-correction; keyterm prompting is English-only
+    model="nova-3",
+    language="en-US",
+    smart_format=True,
+    interim_results=True,
+    utterance_end_ms="1200",  # Backstop only; client end-of-speech sends Finalize for the fast path
+    vad_events=True,
+    encoding="linear16",
+    sample_rate=SAMPLE_RATE,
+    channels=1
+)
+
+# Deepgram event -> RealtimeSTTService handler method; the full set registered on every connection
+_EVENT_HANDLERS = (
+    (LiveTranscriptionEvents.Transcript, "_handle_message"),
+    (LiveTranscriptionEvents.Metadata, "_handle_metadata"),
+    (LiveTranscriptionEvents.SpeechStarted, "_handle_speech_started"),
+    (LiveTranscriptionEvents.UtteranceEnd, "_handle_utterance_end"),
+    (LiveTranscriptionEvents.Error, "_handle_error_event"),
+    (LiveTranscriptionEvents.Close, "_handle_close"),
+)
+
+
+def _init_deepgram(service: "RealtimeSTTService"):
+    """Create the Deepgram client for a service instance."""
+    if not settings.DEEPGRAM_API_KEY:
+        raise ValueError("DEEPGRAM_API_KEY not configured in .env")
+    
+    service.deepgram_client = DeepgramClient(settings.DEEPGRAM_API_KEY, _CLIENT_OPTIONS)
+
+
+def _init_assemblyai(service: "RealtimeSTTService"):
+    """Validate AssemblyAI settings; streaming itself is not implemented yet."""
+    if not settings.ASSEMBLYAI_API_KEY:
+        raise ValueError("ASSEMBLYAI_API_KEY not configured in .env")
+    # AssemblyAI implementation would go here
+    raise NotImplementedError("AssemblyAI streaming not yet implemented")
+
+
+# STT_PROVIDER name -> setup function run by RealtimeSTTService.__init__
+_PROVIDERS = {
+    "deepgram": _init_deepgram,
+    "assemblyai": _init_assemblyai,
+}
+
+
+def _tune_ws_pings(connection):
+    """Apply WS_PING_INTERVAL/WS_PING_TIMEOUT to the SDK's underlying websocket.
+    
+    The Deepgram SDK does not expose the websockets ping settings, but the library's keepalive
+    loop rereads them on every ping, so setting them after connect takes effect. Best effort:
+    skipped if the SDK keeps its socket under a different attribute.
+    """
+    ws = getattr(connection, "_socket", None) or getattr(connection, "_websocket", None)
+    if ws is not None and hasattr(ws, "ping_interval"):
+        ws.ping_interval = WS_PING_INTERVAL
+        ws.ping_timeout = WS_PING_TIMEOUT
+
 
 class RealtimeSTTService:
     """Service for real-time speech-to-text transcription."""
@@ -22,29 +119,39 @@ class RealtimeSTTService:
         self.provider = settings.STT_PROVIDER
         self.deepgram_client = None
         self.connection = None
+        # True from a successful start until stop() or a failed reconnect; checked per audio chunk
+        self._ready = False
+        self._keepalive_task: Optional[asyncio.Task] = None
+        self._send_queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self._sender_task: Optional[asyncio.Task] = None
+        self._last_send_ts = 0.0  # monotonic time of the last frame sent to Deepgram
+        # Mic audio not yet sent lives in _pending[:_pending_len]; the buffer is reused across calls
+        self._pending = bytearray(MAX_PENDING_BYTES)
+        self._pending_len = 0
+        self._frame_bytes = SAMPLE_RATE * FRAME_MS // 1000 * 2
+        self._callback_tasks: set = set()  # transcript callbacks still running
+        self._last_interim = ""  # last interim text delivered, reset on every final
+        self._on_transcript: Optional[Callable[[str, bool, bool], None]] = None
+        self._on_error: Optional[Callable[[str], None]] = None
+        self._live_options = _LIVE_OPTIONS  # per-session copy when keyterms are given
+        # Bound once here so reconnects reuse the same handler objects
+        self._handlers = tuple((event, getattr(self, name)) for event, name in _EVENT_HANDLERS)
+        # Cleared while reconnecting; the sender holds queued audio until it is set again
+        self._connected = asyncio.Event()
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._overflowing = False  # set while the send queue is dropping frames
         
-        if self.provider == "deepgram":
-            if not settings.DEEPGRAM_API_KEY:
-                raise ValueError("DEEPGRAM_API_KEY not configured in .env")
-            
-            config = DeepgramClientOptions(
-                options={"keepalive": "true"}
-            )
-            self.deepgram_client = DeepgramClient(settings.DEEPGRAM_API_KEY, config)
-        
-        elif self.provider == "assemblyai":
-            if not settings.ASSEMBLYAI_API_KEY:
-                raise ValueError("ASSEMBLYAI_API_KEY not configured in .env")
-            # AssemblyAI implementation would go here
-            raise NotImplementedError("AssemblyAI streaming not yet implemented")
-        
-        else:
+        factory = _PROVIDERS.get(self.provider)
+        if factory is None:
             raise ValueError(f"Unknown STT provider: {self.provider}")
+        factory(self)
     
     async def start_streaming(
         self,
         on_transcript: Callable[[str, bool, bool], None],
-        on_error: Optional[Callable[[str], None]] = None
+        on_error: Optional[Callable[[str], None]] = None,
+        keyterms: Optional[List[str]] = None
     ):
         """
         Start streaming STT session.
@@ -52,139 +159,316 @@ class RealtimeSTTService:
         Args:
             on_transcript: Callback for transcription results (text, is_final, speech_final)
             on_error: Optional callback for errors
+            keyterms: Optional vocabulary to boost, e.g. the candidate's skills (first 100 used)
         """
         if self.provider == "deepgram":
-            await self._start_deepgram_streaming(on_transcript, on_error)
+            await self._start_deepgram_streaming(on_transcript, on_error, keyterms)
     
     async def _start_deepgram_streaming(
         self,
         on_transcript: Callable[[str, bool, bool], None],
-        on_error: Optional[Callable[[str], None]] = None
+        on_error: Optional[Callable[[str], None]] = None,
+        keyterms: Optional[List[str]] = None
     ):
         """Start Deepgram streaming connection."""
+        terms = list(dict.fromkeys(t.strip() for t in keyterms or [] if t and t.strip()))[:KEYTERM_LIMIT]
+        self._live_options = dataclasses.replace(_LIVE_OPTIONS, keyterm=terms) if terms else _LIVE_OPTIONS
+        self._on_transcript = on_transcript
+        self._on_error = on_error
+        self._stopping = False
         try:
-            # Configure Deepgram options
-            options = LiveOptions(
-                model="nova-2-conversationalai",  # Optimized for voice interviews and conversations
-                language="en-US",
-                smart_format=True,
-                interim_results=True,
-                utterance_end_ms="2000",  # Wait 2 seconds of silence (reduced from 3s for faster response)
-                vad_events=True,
-                encoding="linear16",
-                sample_rate=16000,
-                channels=1
-            )
-            
-            print("[STT] Deepgram configured with 3-second utterance detection")
-            
-            # Create connection
-            self.connection = self.deepgram_client.listen.asyncwebsocket.v("1")
-            
-            # Set up event handlers
-            async def on_message(self_inner, result, **kwargs):
-                try:
-                    sentence = result.channel.alternatives[0].transcript
-                    
-                    if len(sentence) == 0:
-                        return
-                    
-                    is_final = result.is_final
-                    speech_final = result.speech_final  # True when speech segment ends
-                    
-                    print(f"[STT] {'FINAL' if is_final else 'INTERIM'} (speech_final={speech_final}): {sentence}")
-                    
-                    # Call the callback with speech_final info
-                    if on_transcript:
-                        try:
-                            # Pass is_final and speech_final to properly detect when speech ends
-                            await on_transcript(sentence, is_final, speech_final)
-                            print(f"[STT] Callback executed successfully")
-                        except Exception as callback_error:
-                            print(f"[STT ERROR] Callback failed: {str(callback_error)}")
-                            import traceback
-                            traceback.print_exc()
-                except Exception as e:
-                    print(f"[STT ERROR] on_message failed: {str(e)}")
-                    import traceback
-                    traceback.print_exc()
-            
-            async def on_metadata(self_inner, metadata, **kwargs):
-                try:
-                    print(f"[STT] Metadata: {metadata}")
-                except Exception as e:
-                    print(f"[STT ERROR] on_metadata failed: {str(e)}")
-            
-            async def on_speech_started(self_inner, speech_started, **kwargs):
-                try:
-                    print("[STT] Speech started")
-                except Exception as e:
-                    print(f"[STT ERROR] on_speech_started failed: {str(e)}")
-            
-            async def on_utterance_end(self_inner, utterance_end, **kwargs):
-                try:
-                    print("[STT] Utterance ended")
-                except Exception as e:
-                    print(f"[STT ERROR] on_utterance_end failed: {str(e)}")
-            
-            async def on_error_event(self_inner, error, **kwargs):
-                try:
-                    print(f"[STT ERROR] Deepgram error: {error}")
-                    if on_error:
-                        await on_error(str(error))
-                except Exception as e:
-                    print(f"[STT ERROR] on_error_event failed: {str(e)}")
-            
-            async def on_close(self_inner, close, **kwargs):
-                try:
-                    print("[STT] Connection closed")
-                except Exception as e:
-                    print(f"[STT ERROR] on_close failed: {str(e)}")
-            
-            # Register event handlers
-            self.connection.on(LiveTranscriptionEvents.Transcript, on_message)
-            self.connection.on(LiveTranscriptionEvents.Metadata, on_metadata)
-            self.connection.on(LiveTranscriptionEvents.SpeechStarted, on_speech_started)
-            self.connection.on(LiveTranscriptionEvents.UtteranceEnd, on_utterance_end)
-            self.connection.on(LiveTranscriptionEvents.Error, on_error_event)
-            self.connection.on(LiveTranscriptionEvents.Close, on_close)
-            
-            # Start connection
-            if await self.connection.start(options):
-                print("[STT] Successfully connected to Deepgram")
-            else:
+            if not await self._connect_with_backoff():
                 raise Exception("Failed to connect to Deepgram")
+            self._ready = True
+            self._sender_task = asyncio.create_task(self._drain_sender())
+            self._keepalive_task = asyncio.create_task(self._keepalive_loop())
                 
         except Exception as e:
-            print(f"[STT ERROR] Failed to start Deepgram streaming: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"[STT ERROR] Failed to start Deepgram streaming: {str(e)}")
             if on_error:
                 await on_error(str(e))
             raise
     
-    async def send_audio(self, audio_data: bytes):
-        """Send audio data to the STT service."""
-        if not self.connection:
-            raise Exception("STT connection not established")
+    async def _connect_with_backoff(self) -> bool:
+        """Open a Deepgram connection, retrying with jittered backoff. Returns False once retries run out."""
+        for attempt, delay in enumerate((0.0,) + RECONNECT_DELAYS, start=1):
+            if self._stopping:
+                return False
+            if delay:
+                await asyncio.sleep(delay + random.uniform(0, RECONNECT_JITTER))
+            try:
+                if await self._open_connection():
+                    self._connected.set()
+                    return True
+                logger.warning(f"[STT] Connect attempt {attempt} was rejected by Deepgram")
+            except Exception as e:
+                logger.warning(f"[STT] Connect attempt {attempt} failed: {str(e)}")
+        return False
+    
+    async def _open_connection(self) -> bool:
+        """Create a Deepgram connection with event handlers and start it."""
+        connection = self.deepgram_client.listen.asyncwebsocket.v("1")
+        
+        # Register event handlers; the SDK calls them with the connection as the first argument
+        for event, handler in self._handlers:
+            connection.on(event, handler)
         
+        # Start connection
+        if not await connection.start(self._live_options):
+            return False
+        logger.info("[STT] Successfully connected to Deepgram")
+        _tune_ws_pings(connection)
+        self.connection = connection
+        self._last_send_ts = time.monotonic()
+        return True
+    
+    async def _handle_message(self, connection, result, **kwargs):
+        """Deliver a transcript result to the on_transcript callback."""
         try:
-            await self.connection.send(audio_data)
-        except Exception as e:
-            print(f"[STT ERROR] Failed to send audio: {str(e)}")
-            raise
+            alternatives = result.channel.alternatives
+            if not alternatives:
+                return
+            sentence = alternatives[0].transcript
+            if not sentence:
+                return
+            
+            is_final = result.is_final
+            # True when speech segment ends, or for the final forced by finalize()
+            speech_final = result.speech_final or bool(getattr(result, "from_finalize", False))
+            
+            # Deepgram often repeats the same partial on word-boundary ticks; pass each one on once
+            if is_final:
+                self._last_interim = ""
+            elif sentence == self._last_interim:
+                return
+            else:
+                self._last_interim = sentence
+            
+            # Lazy args: interims arrive every ~100 ms and are dropped at the default level
+            logger.debug("[STT] %s (speech_final=%s): %s", "FINAL" if is_final else "INTERIM", speech_final, sentence)
+            
+            # Call the callback with speech_final info
+            if self._on_transcript:
+                # Scheduled, not awaited, so downstream I/O never stalls Deepgram's receive loop.
+                # Tasks start in creation order, so transcripts are still delivered in order.
+                task = asyncio.create_task(self._on_transcript(sentence, is_final, speech_final))
+                self._callback_tasks.add(task)
+                task.add_done_callback(self._on_callback_done)
+        except Exception:
+            logger.exception("[STT ERROR] on_message failed")
+    
+    async def _handle_metadata(self, connection, metadata, **kwargs):
+        """Log stream metadata."""
+        try:
+            logger.debug("[STT] Metadata: %s", metadata)
+        except Exception:
+            logger.exception("[STT ERROR] on_metadata failed")
+    
+    async def _handle_speech_started(self, connection, speech_started, **kwargs):
+        """Log Deepgram VAD speech start."""
+        try:
+            logger.debug("[STT] Speech started")
+        except Exception:
+            logger.exception("[STT ERROR] on_speech_started failed")
+    
+    async def _handle_utterance_end(self, connection, utterance_end, **kwargs):
+        """On Deepgram utterance end, send Finalize so the last words come back as final right away.
+        
+        The browser client has no VAD of its own, so this is what triggers the Finalize fast path;
+        a client "speech_end" message still works the same way.
+        """
+        try:
+            logger.debug("[STT] Utterance ended")
+            await self.finalize()
+        except Exception:
+            logger.exception("[STT ERROR] on_utterance_end failed")
+    
+    async def _handle_error_event(self, connection, error, **kwargs):
+        """Report a Deepgram error to the on_error callback."""
+        try:
+            logger.error(f"[STT ERROR] Deepgram error: {error}")
+            if self._on_error:
+                await self._on_error(str(error))
+        except Exception:
+            logger.exception("[STT ERROR] on_error_event failed")
+    
+    async def _handle_close(self, connection, close, **kwargs):
+        """Reconnect if the live socket closed unexpectedly."""
+        try:
+            logger.debug("[STT] Connection closed")
+            # Unexpected close of the live socket (not stop() or an old socket being replaced)
+            if connection is self.connection:
+                self._request_reconnect()
+        except Exception:
+            logger.exception("[STT ERROR] on_close failed")
+    
+    def _request_reconnect(self):
+        """Start the reconnect supervisor unless stopping or one is already running."""
+        if self._stopping or (self._reconnect_task and not self._reconnect_task.done()):
+            return
+        self._connected.clear()
+        self._reconnect_task = asyncio.create_task(self._reconnect())
+    
+    async def _reconnect(self):
+        """Replace a dropped connection; queued and buffered audio then goes to the new one."""
+        logger.warning("[STT] Deepgram connection lost, reconnecting")
+        old = self.connection
+        if old:
+            try:
+                await old.finish()
+            except Exception:
+                pass  # Already closed
+        if await self._connect_with_backoff():
+            logger.info("[STT] Reconnected to Deepgram")
+        elif not self._stopping:
+            logger.error("[STT ERROR] Could not reconnect to Deepgram")
+            self._ready = False  # Audio is dropped from here on; the session was told via on_error
+            if self._on_error:
+                await self._on_error("Lost connection to speech-to-text service")
+    
+    def _on_callback_done(self, task: asyncio.Task):
+        """Forget a finished transcript callback and log its failure, if any."""
+        self._callback_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("[STT ERROR] Callback failed", exc_info=task.exception())
+    
+    async def _keepalive_loop(self):
+        """Keep the Deepgram socket open through silences (candidate thinking) with KeepAlive text frames."""
+        while self._ready:
+            await asyncio.sleep(KEEPALIVE_INTERVAL)
+            if self._connected.is_set() and time.monotonic() - self._last_send_ts >= KEEPALIVE_INTERVAL:
+                # Through the send queue, so the sender stays the socket's only writer
+                self._enqueue(KEEPALIVE_MESSAGE)
+    
+    def _enqueue(self, frame):
+        """Queue a frame for the sender task, dropping the oldest queued frame when full."""
+        try:
+            self._send_queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            if not self._overflowing:
+                self._overflowing = True
+                logger.warning(f"[STT] Send backlog over {MAX_BUFFERED_MS} ms, dropping oldest audio")
+            self._send_queue.get_nowait()
+            self._send_queue.put_nowait(frame)
+    
+    async def _drain_sender(self):
+        """Write queued frames to Deepgram until the None sentinel from stop()."""
+        while True:
+            frame = await self._send_queue.get()
+            if frame is None:
+                return
+            # Retry the frame on the new connection if this one drops
+            while True:
+                await self._connected.wait()
+                try:
+                    # The SDK reports a closed socket by returning False rather than raising
+                    if isinstance(frame, memoryview):
+                        # Zero-copy slice of a caller's buffer; materialized only here, once
+                        frame = bytes(frame)
+                    if await self.connection.send(frame) is False:
+                        raise ConnectionError("Deepgram socket closed")
+                    self._last_send_ts = time.monotonic()
+                    break
+                except Exception as e:
+                    logger.error(f"[STT ERROR] Failed to send audio: {str(e)}")
+                    self._request_reconnect()
+                    if self._stopping:
+                        break
+            if self._overflowing and self._send_queue.empty():
+                self._overflowing = False  # Caught up; warn again on the next backlog
+    
+    async def send_audio(self, audio_data: Union[bytes, bytearray, memoryview]):
+        """Queue audio for the STT service in frames of at least 200 ms; returns without waiting on the network.
+        
+        Chunks of a frame or more (the browser's ScriptProcessor sends ~256 ms) are queued as they
+        are, as views of audio_data rather than copies, so callers must not mutate the buffer after
+        passing it in. Only smaller chunks are coalesced.
+        
+        Audio arriving while the service is not streaming (before start, after stop, or after
+        reconnecting failed) is dropped so shutdown does not raise an error per chunk.
+        """
+        if not self._ready:
+            return
+        
+        frame_bytes = self._frame_bytes
+        audio_data = memoryview(audio_data).cast("B")
+        if not self._pending_len and len(audio_data) >= frame_bytes:
+            # Nothing buffered and already frame-sized: forward the chunk unchanged
+            self._enqueue(audio_data)
+            return
+        
+        pending = self._pending
+        start = self._pending_len
+        end = start + len(audio_data)
+        if end > MAX_PENDING_BYTES:
+            # Keep only the newest MAX_BUFFERED_MS, trimming whole samples from the front
+            overflow = (end - MAX_PENDING_BYTES + 1) & ~1
+            logger.warning(f"[STT] Audio chunk over {MAX_BUFFERED_MS} ms, dropping {overflow} oldest bytes")
+            if overflow >= start:
+                audio_data = audio_data[overflow - start:]
+                start = 0
+            else:
+                pending[:start - overflow] = pending[overflow:start]
+                start -= overflow
+            end = start + len(audio_data)
+        pending[start:end] = audio_data
+        
+        view = memoryview(pending)
+        offset = 0
+        while end - offset >= frame_bytes:
+            self._enqueue(bytes(view[offset:offset + frame_bytes]))
+            offset += frame_bytes
+        view.release()
+        if offset:
+            # Move the partial frame to the front
+            pending[:end - offset] = pending[offset:end]
+        self._pending_len = end - offset
+    
+    async def finalize(self):
+        """Ask Deepgram to emit the final transcript now instead of waiting out the silence timers."""
+        if not self._ready:
+            return
+        # Flush the partial frame first so Finalize covers all audio received so far
+        if self._pending_len:
+            self._enqueue(bytes(self._pending[:self._pending_len]))
+            self._pending_len = 0
+        self._enqueue(FINALIZE_MESSAGE)
     
     async def stop(self):
         """Stop the STT service and close connection."""
+        flush = self._ready
+        self._ready = False
+        self._stopping = True
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self._keepalive_task:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+        if self._pending_len and flush:
+            self._enqueue(bytes(self._pending[:self._pending_len]))
+        self._pending_len = 0
+        if self._sender_task and not self._connected.is_set():
+            # Nothing can be sent without a connection
+            self._sender_task.cancel()
+            self._sender_task = None
+        if self._sender_task:
+            # Sender exits after the audio queued ahead of the sentinel has been sent
+            self._enqueue(None)
+            try:
+                await asyncio.wait_for(self._sender_task, timeout=SEND_DRAIN_TIMEOUT)
+            except Exception:
+                pass  # Timed out (wait_for cancels it) or already failed
+            self._sender_task = None
         if self.connection:
             try:
                 await self.connection.finish()
-                print("[STT] Connection closed successfully")
+                logger.info("[STT] Connection closed successfully")
             except Exception as e:
-                print(f"[STT ERROR] Error closing connection: {str(e)}")
+                logger.error(f"[STT ERROR] Error closing connection: {str(e)}")
             finally:
                 self.connection = None
     
     def is_connected(self) -> bool:
         """Check if STT service is connected."""
-        return self.connection is not None
+        return self._ready
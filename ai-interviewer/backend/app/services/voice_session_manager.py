@@ -4,7 +4,7 @@ Orchestrates the real-time voice interview pipeline: STT → LLM → Response
 """
 
 import asyncio
-from typing import Dict, Optional, Callable
+from typing import Dict, List, Optional, Callable
 from datetime import datetime
 from bson import ObjectId
 
@@ -27,11 +27,14 @@ class VoiceSessionManager:
         # Transcript accumulation for complete answers
         self.accumulated_transcript = ""
         self.silence_timer: Optional[asyncio.Task] = None
-        self.silence_duration = 1.5  # OPTIMIZED: Reduced from 3s. Deepgram already waits 2s via utterance_end_ms
+        self.silence_duration = 1.5  # OPTIMIZED: Reduced from 3s. Deepgram already waits 1.2s via utterance_end_ms
         
         # In-memory transcript to avoid DB fetch for assessment (saves ~100-200ms)
         self.in_memory_transcript = []  # List of {"question": str, "answer": str}
         
+        # Resume skills, boosted as Deepgram keyterms so tech terms transcribe correctly
+        self.keyterms: List[str] = []
+        
         # Callbacks
         self.on_question_ready: Optional[Callable[[str, int], None]] = None
         self.on_interview_complete: Optional[Callable[[dict], None]] = None
@@ -62,6 +65,7 @@ class VoiceSessionManager:
             # Store resume data for later use
             self.resume_text = resume_profile.get("extracted_text", "")
             self.chunks = resume_profile.get("chunks", [])
+            self.keyterms = resume_profile.get("skills", [])
             self.user_id = user_id
             
             # Get first question from AI agent
@@ -107,7 +111,8 @@ class VoiceSessionManager:
             
             await self.stt_service.start_streaming(
                 on_transcript=self._handle_transcript,
-                on_error=self._handle_stt_error
+                on_error=self._handle_stt_error,
+                keyterms=self.keyterms
             )
             
             print(f"[SESSION {self.session_id}] STT streaming started")
@@ -131,6 +136,11 @@ class VoiceSessionManager:
             if self.on_error:
                 await self.on_error(str(e))
     
+    async def end_of_speech(self):
+        """Client VAD detected the candidate stopped talking; get the final transcript early."""
+        if self.stt_service:
+            await self.stt_service.finalize()
+    
     async def _handle_transcript(self, text: str, is_final: bool, speech_ended: bool = False):
         """Handle transcription results from STT with proper accumulation.
         
@@ -433,7 +443,7 @@ class VoiceSessionManager:
     async def cleanup(self):
         """Clean up session resources."""
         if self.stt_service:
-            await self.stt_service.stop_streaming()
+            await self.stt_service.stop()
         
         self.is_active = False
         print(f"[SESSION {self.session_id}] Cleaned up")
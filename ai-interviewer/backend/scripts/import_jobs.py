@@ -150,6 +150,10 @@ def import_jobs_from_excel(excel_path, limit=10000):
         
         print(f"✅ Filtered to {len(df)} most relevant jobs")
     
+    # Lowercase copies used by the indexed location / experience filters
+    df['location_lower'] = df['location'].fillna('').str.lower() if 'location' in df.columns else ''
+    df['experience_level_lower'] = df['experience_level'].fillna('').str.lower() if 'experience_level' in df.columns else ''
+    
     # Add metadata
     df['imported_at'] = datetime.utcnow()
     df['is_active'] = True
@@ -181,9 +185,21 @@ def import_jobs_from_excel(excel_path, limit=10000):
     # Create indexes for fast queries
     print("\n🔍 Creating indexes...")
     jobs_collection.create_index([('skills', 1)])
-    jobs_collection.create_index([('location', 1)])
-    jobs_collection.create_index([('experience_level', 1)])
-    jobs_collection.create_index([('title', 'text'), ('company', 'text')])
+    jobs_collection.create_index([('location_lower', 1)])
+    jobs_collection.create_index([('experience_level_lower', 1)])
+    # Same weighted text index the API creates at startup. Only one text index is allowed
+    # per collection, so a legacy one (e.g. title_text_company_text) is dropped first
+    text_weights = {'title': 10, 'skills': 5, 'company': 3, 'description': 1}
+    for name, info in jobs_collection.index_information().items():
+        is_text = any(kind == 'text' for _, kind in info['key'])
+        if is_text and (name != 'job_text_weighted' or info.get('weights') != text_weights):
+            print(f"🗑️  Dropping legacy text index {name}")
+            jobs_collection.drop_index(name)
+    jobs_collection.create_index(
+        [(field, 'text') for field in text_weights],
+        weights=text_weights,
+        name='job_text_weighted'
+    )
     print("✅ Indexes created")
     
     # Display sample job
@@ -100,6 +100,11 @@ async def seed_jobs():
         })
         job_id += 1
     
+    # Lowercase copies for the indexed location / experience filters, as import_jobs.py writes
+    for job in jobs:
+        job["location_lower"] = job["location"].lower()
+        job["experience_level_lower"] = job["experience_level"].lower()
+    
     # Insert all jobs
     print(f"\n📝 Inserting {len(jobs)} new software jobs with detailed descriptions...")
     result = await db.jobs.insert_many(jobs)
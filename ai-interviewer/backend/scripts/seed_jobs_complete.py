@@ -168,6 +168,11 @@ async def seed_jobs():
             "application_url": f"https://careers.example.com/apply/{idx}"
         })
     
+    # Lowercase copies for the indexed location / experience filters, as import_jobs.py writes
+    for job in jobs:
+        job["location_lower"] = job["location"].lower()
+        job["experience_level_lower"] = job["experience_level"].lower()
+    
     print(f"\n📝 Inserting {len(jobs)} jobs with detailed descriptions...")
     result = await db.jobs.insert_many(jobs)
     print(f"✅ Successfully inserted {len(result.inserted_ids)} jobs!")